@@ -2,10 +2,16 @@ from fastapi import APIRouter
 from app.api.v1.routes import auth
 from app.api.v1.routes import job
 from app.api.v1.routes import member
+from app.api.v1.routes import internal
+from app.api.v1.routes import public
+from app.api.v1.routes import audit
 
 
 router = APIRouter()
 
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
 router.include_router(job.router, prefix="/jobs", tags=["jobs"])
-router.include_router(member.router, prefix="/members", tags=["members"])
\ No newline at end of file
+router.include_router(member.router, prefix="/members", tags=["members"])
+router.include_router(internal.router, prefix="/internal", tags=["internal"])
+router.include_router(public.router, prefix="/public", tags=["public"])
+router.include_router(audit.router, prefix="/audit", tags=["audit"])
\ No newline at end of file
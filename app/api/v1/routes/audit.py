@@ -0,0 +1,30 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from app.api.v1.schemas.audit import AuditEventResponse, AuditFilters
+from app.core.database import DBSession, get_db, run_db
+from app.core.query_budget import query_budget
+from app.db.models.user import User
+from app.db.repositories.audit import get_audit_events_db
+from app.utils.auth import get_current_user
+from app.utils.pagination import InvalidCursor
+from app.utils.response_utils import PaginatedResponseModel, ResponseHandler
+
+router = APIRouter()
+
+
+# Get a page of audit events, newest first (admin only). Events reach the table
+# within AUDIT_FLUSH_INTERVAL_SECONDS of the change.
+@router.get("/", response_model=PaginatedResponseModel[AuditEventResponse])
+@query_budget(2)
+async def get_audit_events(filters: AuditFilters = Depends(), limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = None, db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    try:
+        events, next_cursor = await run_db(db, get_audit_events_db, filters, limit, cursor)
+    except InvalidCursor:
+        return ResponseHandler.error(message="Invalid cursor", status_code=400)
+    if events:
+        return ResponseHandler.paginated(data=[AuditEventResponse.model_validate(event) for event in events], page_size=limit, next_cursor=next_cursor, message="Audit events fetched successfully")
+    return ResponseHandler.error(message="No audit events found", status_code=404)
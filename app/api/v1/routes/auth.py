@@ -1,28 +1,17 @@
-import os
-from datetime import timedelta
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import APIRouter, Depends, Body, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Body
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
 from app.api.v1.schemas.user import UserCreate, UserResponse
 from app.api.v1.schemas.token import Token
-from app.core.database import get_db
+from app.core.database import DBSession, get_db, run_db
+from app.core.query_budget import query_budget
+from app.core.rate_limit import limit, limit_by_ip, login_account, login_ip, refresh_ip, register_ip
 from app.db.repositories.user import create_user, get_user_by_email
-from app.utils.auth import authenticate_user, create_access_token, create_refresh_token, validate_email, get_current_user
+from app.utils.auth import authenticate_user, decode_token, issue_tokens, revoke_sessions, revoke_tokens, token_denylist, validate_email, get_current_user, hash_password, user_conflict_message
 from app.utils.response_utils import ResponseHandler, ResponseModel
 from app.db.models.user import User
 
-# Environment variables
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 1440))
-
-# Password Context for hashing and verification
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 Password Bearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -30,28 +19,31 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 router = APIRouter()
 
 # Register new user
-@router.post("/register/", response_model=ResponseModel[UserResponse])
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register/", response_model=ResponseModel[UserResponse], dependencies=[limit_by_ip(register_ip)])
+@query_budget(2)
+async def register_user(user: UserCreate, db: DBSession = Depends(get_db)):
 
     # Validate email format
     if not validate_email(user.email):
         return ResponseHandler.error("Invalid email address", status_code=400)
     
-    # Check if email is already in use
-    db_user_by_email = get_user_by_email(db, email=user.email)
-    if db_user_by_email:
-        return ResponseHandler.error("Email already registered", status_code=400)
-
-    # Create the new user and return response
-    created_user = create_user(db=db, user=user)
+    # Create the new user in one statement; a taken email or username comes back as no row
+    hashed_password = await hash_password(user.password)
+    created_user = await run_db(db, create_user, user, hashed_password)
+    if created_user is None:
+        return ResponseHandler.error(await user_conflict_message(db, user), status_code=400)
     user_response = UserResponse.model_validate(created_user)
     return ResponseHandler.success(data=user_response, message="User registered successfully")
 
 # Login and provide access token
-@router.post("/login/", response_model=ResponseModel[Token])
-def login_for_access_token(email: str = Body(...), password: str = Body(...), db: Session = Depends(get_db)):
+@router.post("/login/", response_model=ResponseModel[Token], dependencies=[limit_by_ip(login_ip)])
+@query_budget(2)
+async def login_for_access_token(email: str = Body(...), password: str = Body(...), db: DBSession = Depends(get_db)):
+    # Throttle guesses against one account from many addresses before any bcrypt work
+    await limit(login_account, email.strip().lower())
+
     # Authenticate user
-    user = authenticate_user(db, email, password)
+    user = await authenticate_user(db, email, password)
     if not user:
         return ResponseHandler.error(
             "Incorrect username or password",
@@ -59,26 +51,8 @@ def login_for_access_token(email: str = Body(...), password: str = Body(...), db
             details={"WWW-Authenticate": "Bearer"}
         )
     
-    # Generate access and refresh tokens
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    refresh_token_expires = timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES)
-    
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    refresh_token = create_refresh_token(
-        data={"sub": user.email}, expires_delta=refresh_token_expires
-    )
-    
-    # Return success with tokens
-    return ResponseHandler.success(
-        data={
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "token_type": "bearer"
-        },
-        message="Login successful"
-    )
+    # Return success with a new access and refresh token pair
+    return ResponseHandler.success(data=issue_tokens(user), message="Login successful")
 
 class RefreshTokenRequestBody(BaseModel):
     refresh_token: str
@@ -86,48 +60,64 @@ class RefreshTokenRequestBody(BaseModel):
 
 #Get current user info
 @router.get("/user/", response_model=ResponseModel[UserResponse])
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+@query_budget(1)
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error("User not found", status_code=404)
     return ResponseHandler.success(data=UserResponse.model_validate(current_user), message="User found")
 
 
-# Refresh access token using refresh token
-@router.post("/refresh/", response_model=ResponseModel[Token])
-def refresh_access_token(body: RefreshTokenRequestBody, db: Session = Depends(get_db)):
-    # JWT validation exception
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        # Decode and validate the refresh token
-        payload = jwt.decode(body.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return ResponseHandler.error("Invalid refresh token", status_code=401)
-    except JWTError:
+# Exchange a refresh token for a new token pair; each refresh token works once
+@router.post("/refresh/", response_model=ResponseModel[Token], dependencies=[limit_by_ip(refresh_ip)])
+@query_budget(3)
+async def refresh_access_token(body: RefreshTokenRequestBody, db: DBSession = Depends(get_db)):
+    # Decode and validate the refresh token
+    payload = decode_token(body.refresh_token)
+    if payload is None or payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("sub"):
         return ResponseHandler.error("Invalid refresh token", status_code=401)
 
     # Get user by email and check if user exists
-    user = get_user_by_email(db, email=email)
+    user = await run_db(db, get_user_by_email, email=payload["sub"])
     if user is None:
         return ResponseHandler.error("User not found", status_code=401)
 
-    # Generate a new access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    
-    # Return the new access token and the original refresh token
-    return ResponseHandler.success(
-        data={
-            "access_token": access_token,
-            "refresh_token": body.refresh_token,
-            "token_type": "bearer"
-        },
-        message="Token refreshed successfully"
-    )
\ No newline at end of file
+    # A refresh token used a second time was stolen or replayed: end every session of the user
+    if token_denylist.is_spent(payload["jti"]):
+        await revoke_sessions(db, user.id)
+        return ResponseHandler.error("Refresh token reuse detected", status_code=401)
+    if token_denylist.is_revoked(payload):
+        return ResponseHandler.error("Invalid refresh token", status_code=401)
+
+    # Spend the token; no row back means another worker spent it first, which is reuse too
+    if not await revoke_tokens(db, user.id, [payload]):
+        await revoke_sessions(db, user.id)
+        return ResponseHandler.error("Refresh token reuse detected", status_code=401)
+
+    # Return a new access token and a new refresh token replacing the spent one
+    return ResponseHandler.success(data=issue_tokens(user), message="Token refreshed successfully")
+
+
+class LogoutRequestBody(BaseModel):
+    refresh_token: Optional[str] = None
+
+
+# Log out: revoke the access token used and, if given, the refresh token issued with it
+@router.post("/logout/", response_model=ResponseModel[None])
+@query_budget(2)
+async def logout(body: LogoutRequestBody = Body(default_factory=LogoutRequestBody), token: str = Depends(oauth2_scheme),
+                 current_user: User = Depends(get_current_user), db: DBSession = Depends(get_db)):
+    tokens = [decode_token(token)]
+    if body.refresh_token:
+        tokens.append(decode_token(body.refresh_token))
+    # Only the caller's own tokens, and only ones that can be revoked by id
+    tokens = [claims for claims in tokens if claims and claims.get("jti") and claims.get("uid") == current_user.id]
+    await revoke_tokens(db, current_user.id, tokens)
+    return ResponseHandler.success(data=None, message="Logged out successfully")
+
+
+# Log out everywhere: revoke every token issued to the current user so far
+@router.post("/logout-all/", response_model=ResponseModel[None])
+@query_budget(2)
+async def logout_all(current_user: User = Depends(get_current_user), db: DBSession = Depends(get_db)):
+    await revoke_sessions(db, current_user.id)
+    return ResponseHandler.success(data=None, message="Logged out of all sessions")
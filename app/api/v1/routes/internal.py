@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from app.core.database import async_engine, async_pool_metrics, pool_metrics
+from app.core.query_budget import query_budget
+from app.core.rate_limit import rate_limiter
+from app.core.security import password_hasher
+from app.db.models.user import User
+from app.utils.audit import audit_log
+from app.utils.auth import get_current_user, principal_cache, token_denylist
+from app.utils.job import job_cache, job_facets
+from app.utils.job_expiry import job_expiry
+from app.utils.job_snapshot import public_jobs
+from app.utils.response_utils import ResponseHandler, ResponseModel
+
+router = APIRouter()
+
+
+# Runtime statistics of this worker's caches and connection pools (admin only)
+@router.get("/stats/", response_model=ResponseModel[dict])
+@query_budget(1)
+async def get_stats(current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    stats = {
+        "principal_cache": principal_cache.stats(),
+        "job_facets": job_facets.stats(),
+        "job_cache": job_cache.stats(),
+        "public_jobs": public_jobs.stats(),
+        "job_expiry": job_expiry.stats(),
+        "audit_log": audit_log.stats(),
+        "password_hasher": password_hasher.stats(),
+        "token_denylist": token_denylist.stats(),
+        "rate_limiter": rate_limiter.stats() if rate_limiter is not None else None,
+        "db_pool": {
+            "sync": pool_metrics.stats(),
+            "async": async_pool_metrics.stats() if async_engine is not None else None,
+        },
+    }
+    return ResponseHandler.success(data=stats, message="Stats fetched successfully")
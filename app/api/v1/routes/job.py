@@ -1,99 +1,279 @@
-from fastapi import APIRouter, Depends, HTTPException, Form, status
-from sqlalchemy.orm import Session
+import zlib
+from fastapi import APIRouter, Depends, HTTPException, Form, Query, Request, status
 from uuid import UUID
-from typing import List
+from typing import List, Optional, Tuple
 from app.db.models.job import Job
 from app.db.models.user import User
-from app.api.v1.schemas.job import JobCreate, JobUpdate, JobResponse, CategoriesResponseModel
-from app.core.database import get_db
+from app.api.v1.schemas.job import JobCreate, JobUpdate, JobResponse, JobFilters, JobFacetsResponse, JobSearchResult, JobBulkCreate, JobBulkIds, JobBulkStatusChange, JobBulkItemResult, JobStatus, JobFieldSelection, CategoriesResponseModel, job_projection, job_search_projection
+from app.core.database import DBSession, get_db, run_db
+from app.core.query_budget import query_budget
+from app.utils.audit import audit_log
 from app.utils.auth import get_current_user
-from app.utils.response_utils import ResponseHandler, ResponseModel
-from app.db.repositories.job import update_job_db, delete_job_by_id, get_jobs_db, create_job_db, get_job_by_id,change_job_status_db
+from app.utils.conditional import is_conditional, not_modified, not_modified_response, page_etag, row_etag, with_validators
+from app.utils.export import export_response
+from app.utils.job import job_cache, job_facets
+from app.utils.pagination import InvalidCursor
+from app.utils.response_cache import cached_response
+from app.utils.response_utils import ResponseHandler, ResponseModel, PaginatedResponseModel
+from app.db.repositories.job import update_job_db, delete_job_by_id, get_jobs_db, create_job_db, get_job_by_id, get_job_version_db,change_job_status_db, stream_jobs_db, load_job_facets_db, search_jobs_db, bulk_create_jobs_db, bulk_change_job_status_db, bulk_delete_jobs_db
 
 router = APIRouter()
 
-# Get all jobs
-@router.get("/", response_model=ResponseModel[List[JobResponse]])
-def get_jobs(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+# Tell the validators of each field selection apart: the rows are the same, the representation is not
+def fields_etag(etag: str, fields: Optional[Tuple[str, ...]]) -> str:
+    if fields is None:
+        return etag
+    return f'{etag[:-1]}-{zlib.crc32(",".join(fields).encode()):x}"'
+
+# Build a page of jobs. The ETag is derived from the page's own rows, so every page costs one
+# keyset query however deep it is; a poll with a matching If-None-Match/If-Modified-Since
+# gets a 304 without the page being serialized or sent.
+async def build_jobs_page(request: Request, filters: JobFilters, limit: int, cursor: Optional[str], fields: Optional[Tuple[str, ...]], db: DBSession):
+    try:
+        jobs, next_cursor = await run_db(db, get_jobs_db, filters, limit, cursor, fields)
+    except InvalidCursor:
+        return ResponseHandler.error(message="Invalid cursor", status_code=400)
+    if jobs:
+        etag = fields_etag(page_etag(jobs, next_cursor is not None), fields)
+        last_modified = max(job.updated_at for job in jobs)
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        schema = job_projection(fields)
+        response = ResponseHandler.paginated(data=[schema.model_validate(job) for job in jobs], page_size=limit, next_cursor=next_cursor, message="Jobs fetched successfully")
+        return with_validators(response, etag, last_modified)
+    return ResponseHandler.error(message="No jobs found", status_code=404)
+
+
+# Get a page of jobs (keyset pagination, newest first).
+# ?view=summary or ?fields=a,b,c reads and returns only those columns of each job.
+@router.get("/", response_model=PaginatedResponseModel[JobResponse])
+@query_budget(2)
+async def get_jobs(request: Request, filters: JobFilters = Depends(), selection: JobFieldSelection = Depends(), limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin","editor","viewer"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    jobs = get_jobs_db(db)
-    if jobs:
-        return ResponseHandler.success(data=[JobResponse.model_validate(job) for job in jobs], message="Jobs fetched successfully")
-    return ResponseHandler.error(message="No jobs found", status_code=404)
+    try:
+        fields = selection.resolve()
+    except ValueError as e:
+        return ResponseHandler.error(message=str(e), status_code=400)
+    return await cached_response(job_cache, request, lambda: build_jobs_page(request, filters, limit, cursor, fields, db))
     
 
 # Create a new job
 @router.post("/", response_model=ResponseModel[JobResponse])
-def create_job(job: JobCreate, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+@query_budget(3)
+async def create_job(job: JobCreate, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin","editor"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    job_response = create_job_db(db, job)
+    job_response = await run_db(db, create_job_db, job)
     if job_response:
+        await audit_log.record(current_user, "job.create", "job", job_response.id, job.model_dump(mode="json"))
         return ResponseHandler.success(data=JobResponse.model_validate(job_response), message="Job created successfully")
     return ResponseHandler.error(message="Job not created", status_code=500)
 
 
+# Per-id results of a bulk update/delete, in request order
+def bulk_results(job_ids: List[UUID], rows, result: str) -> List[JobBulkItemResult]:
+    found = {row.id: row for row in rows}
+    return [
+        JobBulkItemResult(id=str(job_id), result=result, job=JobResponse.model_validate(found[job_id]))
+        if job_id in found else JobBulkItemResult(id=str(job_id), result="not_found")
+        for job_id in dict.fromkeys(job_ids)
+    ]
+
+
+# Create many jobs in one transaction
+@router.post("/bulk/", response_model=ResponseModel[List[JobBulkItemResult]])
+@query_budget(2)
+async def bulk_create_jobs(body: JobBulkCreate, db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin","editor"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    rows = await run_db(db, bulk_create_jobs_db, body.jobs)
+    if rows is None:
+        return ResponseHandler.error(message="Jobs not created, no job was saved", status_code=400)
+    for row, item in zip(rows, body.jobs):
+        await audit_log.record(current_user, "job.create", "job", row.id, item.model_dump(mode="json"))
+    results = [JobBulkItemResult(id=str(row.id), result="created", job=JobResponse.model_validate(row)) for row in rows]
+    return ResponseHandler.success(data=results, message="Jobs created successfully")
+
+
+# Audit detail of a status change, from a row returned with its old facet columns
+def status_change(row) -> dict:
+    return {"status": {"from": row.old_status, "to": row.status}}
+
+
+# Change the status of many jobs in one transaction
+@router.put("/bulk/status/", response_model=ResponseModel[List[JobBulkItemResult]])
+@query_budget(2)
+async def bulk_change_job_status(body: JobBulkStatusChange, db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin","editor"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    rows = await run_db(db, bulk_change_job_status_db, body.ids, body.status)
+    for row in rows:
+        await audit_log.record(current_user, "job.status", "job", row.id, status_change(row))
+    return ResponseHandler.success(data=bulk_results(body.ids, rows, "updated"), message="Job statuses updated successfully")
+
+
+# Delete many jobs in one transaction
+@router.post("/bulk/delete/", response_model=ResponseModel[List[JobBulkItemResult]])
+@query_budget(2)
+async def bulk_delete_jobs(body: JobBulkIds, db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin","editor"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    rows = await run_db(db, bulk_delete_jobs_db, body.ids)
+    for row in rows:
+        await audit_log.record(current_user, "job.delete", "job", row.id, {"title": row.title})
+    return ResponseHandler.success(data=bulk_results(body.ids, rows, "deleted"), message="Jobs deleted successfully")
+
+
+# Cached facets; the database is only read when the cache is cold or expired
+async def get_job_facets(db: DBSession):
+    facets = job_facets.get()
+    if facets is None:
+        facets = await run_db(db, load_job_facets_db)
+    return facets
+
+
+# Get job counts per category, status, location and timing
+@router.get("/facets/", response_model=ResponseModel[JobFacetsResponse])
+@query_budget(2)
+async def get_job_facet_counts(db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin", "editor", "viewer"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    facets = await get_job_facets(db)
+    return ResponseHandler.success(data=JobFacetsResponse(**facets), message="Job facets fetched successfully")
+
+
 # Get the categories of jobs
 @router.get("/categories/", response_model=CategoriesResponseModel)
-def get_job_categories(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@query_budget(2)
+async def get_job_categories(db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     
     if current_user.role not in ["admin", "editor", "viewer"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
     
-    # Query distinct categories from the Job model
-    categories = db.query(Job.category).distinct().all()
-    
-    # Convert list of tuples to a list of strings
-    category_list = [category[0] for category in categories]
+    # Categories come from the cached facets
+    facets = await get_job_facets(db)
+    category_list = sorted(facets["category"])
 
     if category_list:
         return ResponseHandler.success(data=category_list, message="Categories fetched successfully")
     return ResponseHandler.error(message="No categories found", status_code=404)   
 
 
+# Build a page of search results
+async def build_search_page(q: str, filters: JobFilters, limit: int, cursor: Optional[str], fields: Optional[Tuple[str, ...]], db: DBSession):
+    try:
+        hits, next_cursor = await run_db(db, search_jobs_db, q, filters, limit, cursor, fields)
+    except InvalidCursor:
+        return ResponseHandler.error(message="Invalid cursor", status_code=400)
+    if hits:
+        schema, result_schema = job_projection(fields), job_search_projection(fields)
+        results = [result_schema(**schema.model_validate(job).model_dump(), rank=rank, snippet=snippet) for job, rank, snippet in hits]
+        return ResponseHandler.paginated(data=results, page_size=limit, next_cursor=next_cursor, message="Jobs fetched successfully")
+    return ResponseHandler.error(message="No jobs found", status_code=404)
 
-# Get a single job by ID
-@router.get("/{job_id}/", response_model=ResponseModel[JobResponse])
-def get_job(job_id: UUID, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+
+# Full-text search over jobs, best match first
+@router.get("/search/", response_model=PaginatedResponseModel[JobSearchResult])
+@query_budget(2)
+async def search_jobs(request: Request, q: str = Query(..., min_length=1, max_length=200), filters: JobFilters = Depends(), selection: JobFieldSelection = Depends(), limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None, db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin","editor","viewer"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    job = get_job_by_id(db, job_id)
+    try:
+        fields = selection.resolve()
+    except ValueError as e:
+        return ResponseHandler.error(message=str(e), status_code=400)
+    return await cached_response(job_cache, request, lambda: build_search_page(q, filters, limit, cursor, fields, db))
+
+
+# Export all jobs matching the filters as NDJSON or CSV
+@router.get("/export/")
+@query_budget(2)
+async def export_jobs(format: str = Query("ndjson", pattern="^(ndjson|csv)$"), filters: JobFilters = Depends(), selection: JobFieldSelection = Depends(), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin","editor","viewer"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    try:
+        fields = selection.resolve()
+    except ValueError as e:
+        return ResponseHandler.error(message=str(e), status_code=400)
+    return export_response(lambda db: stream_jobs_db(db, filters, fields=fields), job_projection(fields), format, "jobs")
+
+
+# Build the response for a single job. Revalidation only needs updated_at;
+# the row is loaded when the client's copy is stale.
+async def build_job(request: Request, job_id: UUID, fields: Optional[Tuple[str, ...]], db: DBSession):
+    if is_conditional(request):
+        last_modified = await run_db(db, get_job_version_db, job_id)
+        if last_modified is not None:
+            etag = fields_etag(row_etag(job_id, last_modified), fields)
+            if not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+    job = await run_db(db, get_job_by_id, job_id, fields)
     if job:
-        return ResponseHandler.success(data=JobResponse.model_validate(job), message="Job fetched successfully")
+        response = ResponseHandler.success(data=job_projection(fields).model_validate(job), message="Job fetched successfully")
+        return with_validators(response, fields_etag(row_etag(job.id, job.updated_at), fields), job.updated_at)
     return ResponseHandler.error(message="Job not found", status_code=404)
+
+
+# Get a single job by ID
+@router.get("/{job_id}/", response_model=ResponseModel[JobResponse])
+@query_budget(3)
+async def get_job(request: Request, job_id: UUID, selection: JobFieldSelection = Depends(), db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin","editor","viewer"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    try:
+        fields = selection.resolve()
+    except ValueError as e:
+        return ResponseHandler.error(message=str(e), status_code=400)
+    return await cached_response(job_cache, request, lambda: build_job(request, job_id, fields, db))
     
 
 # Update an existing job by ID
 @router.put("/{job_id}/edit/", response_model=ResponseModel[JobResponse])
-def update_job(job_id: UUID, job: JobUpdate, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+@query_budget(2)
+async def update_job(job_id: UUID, job: JobUpdate, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin","editor"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    updated_job = update_job_db(db, job_id, job)
+    updated_job = await run_db(db, update_job_db, job_id, job)
     if updated_job:
+        await audit_log.record(current_user, "job.update", "job", updated_job.id, job.model_dump(mode="json", exclude_unset=True))
         return ResponseHandler.success(data=JobResponse.model_validate(updated_job), message="Job updated successfully")
     return ResponseHandler.error(message="Job not found", status_code=404)
 
 
 # change the status of a job
 @router.put("/{job_id}/status/{status}/", response_model=ResponseModel[JobResponse])
-def change_job_status(job_id: UUID, status: str, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+@query_budget(2)
+async def change_job_status(job_id: UUID, status: JobStatus, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin","editor"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    job = change_job_status_db(db, job_id, status)
+    job = await run_db(db, change_job_status_db, job_id, status)
     if job:
+        await audit_log.record(current_user, "job.status", "job", job.id, status_change(job))
         return ResponseHandler.success(data=JobResponse.model_validate(job), message="Job status updated successfully")
     return ResponseHandler.error(message="Job not found", status_code=404)
 
@@ -101,13 +281,15 @@ def change_job_status(job_id: UUID, status: str, db: Session = Depends(get_db),c
 
 # Delete a job by ID
 @router.delete("/{job_id}/delete/", response_model=ResponseModel[JobResponse])
-def delete_job(job_id: UUID, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+@query_budget(2)
+async def delete_job(job_id: UUID, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin","editor"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    job_to_delete = delete_job_by_id(db, job_id)
+    job_to_delete = await run_db(db, delete_job_by_id, job_id)
     if job_to_delete:
+        await audit_log.record(current_user, "job.delete", "job", job_to_delete.id, {"title": job_to_delete.title})
         return ResponseHandler.success(data=JobResponse.model_validate(job_to_delete), message="Job deleted successfully")
     return ResponseHandler.error(message="Job not found", status_code=404)
 
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
 from pydantic import validate_email
-from sqlalchemy.orm import Session
-from app.api.v1.schemas.user import UserCreate, UserResponse
+from app.api.v1.schemas.user import MemberFilters, UserCreate, UserResponse
 from app.db.models.user import User
-from app.core.database import get_db
-from app.db.repositories.user import create_user, get_user_by_email, get_user_by_id, get_user_by_username
-from app.utils.auth import get_current_user
-from app.utils.response_utils import ResponseHandler, ResponseModel
+from app.core.database import DBSession, get_db, run_db
+from app.core.query_budget import query_budget
+from app.db.repositories.user import create_user, delete_user_db, get_members_db, get_user_by_id, stream_users_db, update_user_role_db
+from app.utils.audit import audit_log
+from app.utils.auth import get_current_user, hash_password, principal_cache, revoke_sessions, user_conflict_message
+from app.utils.export import export_response
+from app.utils.pagination import InvalidCursor
+from app.utils.response_utils import PaginatedResponseModel, ResponseHandler, ResponseModel
 
 router = APIRouter()
 
 
 # Create a member viewer or editor
 @router.post("/create/", response_model=ResponseModel[UserResponse])
-def create_member(user:UserCreate, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+@query_budget(3)
+async def create_member(user:UserCreate, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin"]:
@@ -25,66 +29,85 @@ def create_member(user:UserCreate, db: Session = Depends(get_db),current_user: U
     if not validate_email(user.email):
         return ResponseHandler.error("Invalid email address", status_code=400)
     
-    #check if username is already in use
-    db_user_by_username = get_user_by_username(db, username=user.username)
-    if db_user_by_username:
-        return ResponseHandler.error("Username already registered", status_code=400)    
-    
-    # Check if email is already in use
-    db_user_by_email = get_user_by_email(db, email=user.email)
-    if db_user_by_email:
-        return ResponseHandler.error("Email already registered", status_code=400)
-
-    # Create the new user and return response
-    user_response = create_user(db, user)
+    # Create the new user in one statement; a taken username or email comes back as no row
+    hashed_password = await hash_password(user.password)
+    user_response = await run_db(db, create_user, user, hashed_password)
     if user_response:
+        await audit_log.record(current_user, "member.create", "user", user_response.id, {"username": user.username, "email": user.email, "role": user.role})
         return ResponseHandler.success(data=UserResponse.model_validate(user_response), message="User created successfully")
-    return ResponseHandler.error(message="User not created", status_code=500)
+    return ResponseHandler.error(await user_conflict_message(db, user), status_code=400)
+
 
 
+# Get a page of members (keyset pagination by id), filtered by role and searched by username/email
+@router.get("/", response_model=PaginatedResponseModel[UserResponse])
+@query_budget(2)
+async def get_members(filters: MemberFilters = Depends(), limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = None, db: DBSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    try:
+        members, next_cursor = await run_db(db, get_members_db, filters, limit, cursor)
+    except InvalidCursor:
+        return ResponseHandler.error(message="Invalid cursor", status_code=400)
+    if members:
+        return ResponseHandler.paginated(data=[UserResponse.model_validate(member) for member in members], page_size=limit, next_cursor=next_cursor, message="Members fetched successfully")
+    return ResponseHandler.error(message="No members found", status_code=404)
 
-# Get all members
-@router.get("/", response_model=ResponseModel[List[UserResponse]])
-def get_members(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # try:
-        print(current_user)
-        members = db.query(User).all()
-        if members:
-            return ResponseHandler.success(data=[UserResponse.model_validate(member) for member in members], message="Members fetched successfully")
-        print("Error: No members found")
-        return ResponseHandler.error(message="No members found", status_code=404)
-    # except Exception as e:
-    #     print("Error fetching members:", e)
-    #     raise HTTPException(status_code=500, detail=str(e))
 
+# Export all members as NDJSON or CSV (admins only); streamed through export_response's own session, like the jobs export
+@router.get("/export/")
+@query_budget(2)
+async def export_members(format: str = Query("ndjson", pattern="^(ndjson|csv)$"), current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    return export_response(stream_users_db, UserResponse, format, "members")
 
 
 # Change the role of a member
 @router.put("/{user_id}/change-role/{role}", response_model=ResponseModel[UserResponse])
-def change_role(user_id: int, role: str, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+@query_budget(2)
+async def change_role(user_id: int, role: str, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="Admin not found", status_code=404)
     if current_user.role not in ["admin"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    user = get_user_by_id(db, user_id)
+    user = await run_db(db, update_user_role_db, user_id, role)
     if not user:
         return ResponseHandler.error(message="User not found", status_code=404)
-    user.role = role
-    db.commit()
-    db.refresh(user)
+    principal_cache.invalidate_user(user.id)
+    await audit_log.record(current_user, "member.role", "user", user.id, {"role": role})
     return ResponseHandler.success(data=UserResponse.model_validate(user), message="User role changed successfully") 
 
 
 # Delete a member
 @router.delete("/{user_id}/delete/", response_model=ResponseModel[UserResponse])
-def delete_member(user_id: int, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+@query_budget(2)
+async def delete_member(user_id: int, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
+    if not current_user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    if current_user.role not in ["admin"]:
+        return ResponseHandler.error(message="User not authorized", status_code=401)
+    user = await run_db(db, delete_user_db, user_id)
+    if not user:
+        return ResponseHandler.error(message="User not found", status_code=404)
+    principal_cache.invalidate_user(user.id)
+    await audit_log.record(current_user, "member.delete", "user", user.id, {"username": user.username, "email": user.email})
+    return ResponseHandler.success(data=UserResponse.model_validate(user), message="User deleted successfully")
+
+
+# Sign a member out everywhere: every token issued to them so far stops working
+@router.post("/{user_id}/revoke-sessions/", response_model=ResponseModel[UserResponse])
+@query_budget(2)
+async def revoke_member_sessions(user_id: int, db: DBSession = Depends(get_db),current_user: User = Depends(get_current_user)):
     if not current_user:
         return ResponseHandler.error(message="User not found", status_code=404)
     if current_user.role not in ["admin"]:
         return ResponseHandler.error(message="User not authorized", status_code=401)
-    user = get_user_by_id(db, user_id)
+    user = await run_db(db, get_user_by_id, user_id)
     if not user:
         return ResponseHandler.error(message="User not found", status_code=404)
-    db.delete(user)
-    db.commit()
-    return ResponseHandler.success(data=UserResponse.model_validate(user), message="User deleted successfully")
\ No newline at end of file
+    await revoke_sessions(db, user.id)
+    await audit_log.record(current_user, "member.revoke_sessions", "user", user.id)
+    return ResponseHandler.success(data=UserResponse.model_validate(user), message="User sessions revoked successfully")
@@ -0,0 +1,35 @@
+from typing import List
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from app.api.v1.schemas.job import PublicJobResponse
+from app.core.query_budget import query_budget
+from app.utils.conditional import etag_matches
+from app.utils.job_snapshot import public_jobs
+from app.utils.response_utils import ResponseHandler, ResponseModel
+
+router = APIRouter()
+
+# Shared caches and CDNs may keep the board briefly; it is rebuilt within seconds of a change
+PUBLIC_CACHE_CONTROL = "public, max-age=30"
+
+
+# Clients that accept gzip get the pre-compressed body
+def accepts_gzip(request: Request) -> bool:
+    return any(coding.split(";")[0].strip() == "gzip" for coding in request.headers.get("accept-encoding", "").split(","))
+
+
+# Get every active job for the public job board (no authentication)
+@router.get("/jobs/", response_model=ResponseModel[List[PublicJobResponse]])
+@query_budget(0)
+async def get_public_jobs(request: Request):
+    if not public_jobs.ready:
+        return ResponseHandler.error(message="Job board is warming up, try again shortly", status_code=503)
+    gzipped = accepts_gzip(request)
+    # Each encoding is its own representation, so it gets its own strong ETag
+    etag = public_jobs.etag[:-1] + '-gzip"' if gzipped else public_jobs.etag
+    headers = {"ETag": etag, "Cache-Control": PUBLIC_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        return Response(content=public_jobs.gzip_body, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=public_jobs.body, media_type="application/json", headers=headers)
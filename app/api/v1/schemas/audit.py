@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+# Response schema for one audit log entry
+class AuditEventResponse(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor_id: Optional[int] = None
+    actor_email: Optional[str] = None
+    action: str
+    entity_type: str
+    entity_id: str
+    changes: Optional[Dict[str, Any]] = None
+
+    class Config:
+        from_attributes = True
+
+# Optional filters for listing audit entries (bound from query parameters)
+class AuditFilters(BaseModel):
+    entity_type: Optional[str] = None
+    entity_id: Optional[str] = None
+    actor_id: Optional[int] = None
+    action: Optional[str] = None
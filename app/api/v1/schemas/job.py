@@ -1,8 +1,9 @@
-from pydantic import BaseModel,field_validator
+from functools import lru_cache
+from pydantic import BaseModel, Field, create_model, field_validator
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import List
+from typing import Dict, List, Literal, Tuple, Type
 
 # Base class for job-related fields
 class JobBase(BaseModel):
@@ -16,9 +17,20 @@ class JobBase(BaseModel):
     about: str
     responsibilities: List[str]
 
+# last_date is stored as UTC without a time zone; an offset sent by the client is applied first
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 # Schema for creating a job post
 class JobCreate(JobBase):
-    pass
+    # Parsed here so the database driver always receives a datetime
+    last_date: Optional[datetime]
+
+    @field_validator("last_date")
+    def convert_last_date_to_utc(cls, value):
+        return as_naive_utc(value)
 
 # Schema for updating a job post (make all fields optional)
 class JobUpdate(JobBase):
@@ -32,6 +44,10 @@ class JobUpdate(JobBase):
     responsibilities: Optional[List[str]]
     last_date: Optional[datetime]
 
+    @field_validator("last_date")
+    def convert_last_date_to_utc(cls, value):
+        return as_naive_utc(value)
+
 # Response schema for returning job details
 class JobResponse(JobBase):
     id: str
@@ -58,6 +74,165 @@ class JobResponse(JobBase):
         return value
     
 
+# Base of the narrowed job schemas: the same conversions as JobResponse, for whichever fields are present
+class JobProjection(BaseModel):
+    class Config:
+        from_attributes = True
+
+    @field_validator("id", mode="before", check_fields=False)
+    def convert_uuid_to_str(cls, value):
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+
+    @field_validator("created_at","updated_at","last_date", mode="before", check_fields=False)
+    def convert_datetime_to_str(cls, value):
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        return value
+
+
+# A job in a list view: everything but the long about text and the responsibilities
+class JobSummaryResponse(JobProjection):
+    title: str
+    category: str
+    experience_required: int
+    last_date: Optional[str]
+    status: str
+    location: str
+    timing: str
+    id: str
+    created_at: str
+    updated_at: str
+
+
+# Fields a job read can be narrowed to, and those of the summary view
+JOB_FIELDS = tuple(JobResponse.model_fields)
+JOB_SUMMARY_FIELDS = tuple(JobSummaryResponse.model_fields)
+
+# Which fields of each job to return (bound from query parameters); `fields` wins over `view`
+class JobFieldSelection(BaseModel):
+    view: Literal["summary", "full"] = "full"
+    # Comma-separated, e.g. "id,title,status"
+    fields: Optional[str] = Field(None, min_length=1, max_length=500)
+
+    def resolve(self) -> Optional[Tuple[str, ...]]:
+        """The selected fields in schema order, or None for the full job. Raises ValueError naming unknown fields."""
+        if self.fields is None:
+            return JOB_SUMMARY_FIELDS if self.view == "summary" else None
+        requested = {name.strip() for name in self.fields.split(",") if name.strip()}
+        unknown = requested.difference(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+        if not requested:
+            raise ValueError("No job fields selected")
+        selected = tuple(name for name in JOB_FIELDS if name in requested)
+        return None if selected == JOB_FIELDS else selected
+
+# Response schema with only `fields` of a job (None: all of them); built once per field set
+@lru_cache(maxsize=128)
+def job_projection(fields: Optional[Tuple[str, ...]]) -> Type[BaseModel]:
+    if fields is None:
+        return JobResponse
+    if fields == JOB_SUMMARY_FIELDS:
+        return JobSummaryResponse
+    return create_model(
+        "JobProjection_" + "_".join(fields),
+        __base__=JobProjection,
+        **{name: (JobResponse.model_fields[name].annotation, ...) for name in fields},
+    )
+
+
+# A job as shown on the public job board: no status or edit history
+class PublicJobResponse(BaseModel):
+    id: str
+    title: str
+    category: str
+    experience_required: int
+    location: str
+    timing: str
+    about: str
+    responsibilities: Optional[List[str]]
+    last_date: Optional[str]
+    created_at: str
+
+    class Config:
+        from_attributes = True
+
+    @field_validator("id", mode="before")
+    def convert_uuid_to_str(cls, value):
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+
+    @field_validator("created_at","last_date", mode="before")
+    def convert_datetime_to_str(cls, value):
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        return value
+
+
+# A full-text search hit: the job, its rank and a highlighted snippet of `about`
+class JobSearchResult(JobResponse):
+    rank: float
+    snippet: Optional[str] = None
+
+# Search hit schema for a narrowed job (None: the full JobSearchResult)
+@lru_cache(maxsize=128)
+def job_search_projection(fields: Optional[Tuple[str, ...]]) -> Type[BaseModel]:
+    if fields is None:
+        return JobSearchResult
+    return create_model(
+        job_projection(fields).__name__ + "_SearchResult",
+        __base__=job_projection(fields),
+        rank=(float, ...),
+        snippet=(Optional[str], None),
+    )
+
+
+# Largest batch accepted by the bulk job endpoints
+BULK_MAX_ITEMS = 1000
+
+# Schema for creating many job posts at once
+class JobBulkCreate(BaseModel):
+    jobs: List[JobCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+# Schema for acting on many job posts at once
+class JobBulkIds(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+# The statuses the jobs table accepts; anything else is a 422, not an IntegrityError
+JobStatus = Literal["active", "private", "closed"]
+
+# Schema for changing the status of many job posts at once
+class JobBulkStatusChange(JobBulkIds):
+    status: JobStatus
+
+# Outcome for one item of a bulk request: created, updated, deleted or not_found
+class JobBulkItemResult(BaseModel):
+    id: Optional[str] = None
+    result: str
+    job: Optional[JobResponse] = None
+
+
+# Optional filters for listing jobs (bound from query parameters)
+class JobFilters(BaseModel):
+    status: Optional[str] = None
+    location: Optional[str] = None
+    timing: Optional[str] = None
+    category: Optional[str] = None
+    min_experience: Optional[int] = None
+    max_experience: Optional[int] = None
+
+
 #Response model for categories
 class CategoriesResponseModel(BaseModel):
-    categories: List[str]
\ No newline at end of file
+    categories: List[str]
+
+# Job counts per category, status, location and timing
+class JobFacetsResponse(BaseModel):
+    category: Dict[str, int]
+    status: Dict[str, int]
+    location: Dict[str, int]
+    timing: Dict[str, int]
+    total: int
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr
+from typing import Literal, Optional
+from pydantic import BaseModel, EmailStr, Field
 
 class UserCreate(BaseModel):
     username: str
@@ -14,3 +15,11 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Optional filters for listing members (bound from query parameters)
+class MemberFilters(BaseModel):
+    role: Optional[Literal["admin", "editor", "viewer"]] = None
+    # Case-insensitive match on username or email
+    q: Optional[str] = Field(None, min_length=1, max_length=100)
+    match: Literal["prefix", "contains"] = "contains"
@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheUnavailable(Exception):
+    """Raised by a backend that cannot be reached; callers fall back to the database."""
+
+
+class CacheBackend:
+    """Byte-valued key/value store with per-key TTLs and an atomic counter."""
+
+    name = "base"
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Bounded LRU in this worker's memory.
+
+    Only writes made through this worker invalidate it; with several workers, use
+    the Redis backend or accept up to one TTL of staleness from the others.
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self.evictions = 0
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        values = []
+        for key in keys:
+            if key in self._counters:
+                values.append(str(self._counters[key]).encode())
+                continue
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                self._entries.pop(key, None)
+                values.append(None)
+                continue
+            self._entries.move_to_end(key)
+            values.append(entry[1])
+        return values
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "size": len(self._entries), "maxsize": self.maxsize, "evictions": self.evictions}
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal RESP2 client (GET/MGET, SET EX, INCR) over a small connection pool.
+
+    Speaks only the commands above, so any Redis-protocol server works, including
+    a local stand-in for development; the rate limiter's shared store also needs
+    EVAL. A pooled connection found closed is replaced once, so a Redis restart
+    costs no failed command; every other error surfaces as CacheUnavailable.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.database = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.errors = 0
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._command("MGET", *keys)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    async def incr(self, key: str) -> int:
+        return await self._command("INCR", key)
+
+    async def eval(self, script: str, keys: List[str], args: List):
+        return await self._command("EVAL", script, len(keys), *keys, *args)
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "host": self.host, "port": self.port, "idle_connections": len(self._idle), "errors": self.errors}
+
+    async def _command(self, *args):
+        async with self._slots:
+            pooled = bool(self._idle)
+            while True:
+                connection = None
+                try:
+                    connection = self._idle.pop() if pooled else await asyncio.wait_for(self._connect(), self.timeout)
+                    reply = await asyncio.wait_for(self._call(connection, *args), self.timeout)
+                except (OSError, EOFError, asyncio.TimeoutError, CacheUnavailable) as exc:
+                    if connection is not None:
+                        connection[1].close()
+                    # A pooled connection the server has closed (restart, idle timeout) fails on first use:
+                    # drop the others, which are just as stale, and retry once on a new connection
+                    if pooled and isinstance(exc, (ConnectionError, EOFError)):
+                        pooled = False
+                        await self.close()
+                        continue
+                    self.errors += 1
+                    raise CacheUnavailable(str(exc) or type(exc).__name__) from exc
+                except asyncio.CancelledError:
+                    # A reply may still be in flight; the connection cannot be reused
+                    if connection is not None:
+                        connection[1].close()
+                    raise
+                self._idle.append(connection)
+                return reply
+
+    async def _connect(self):
+        connection = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._call(connection, "AUTH", self.password)
+        if self.database:
+            await self._call(connection, "SELECT", self.database)
+        return connection
+
+    async def _call(self, connection, *args):
+        reader, writer = connection
+        writer.write(self._encode(args))
+        await writer.drain()
+        return await self._read(reader)
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read(self, reader: asyncio.StreamReader):
+        line = await reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise CacheUnavailable(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            size = int(payload)
+            if size < 0:
+                return None
+            return (await reader.readexactly(size + 2))[:-2]
+        if kind == b"*":
+            size = int(payload)
+            if size < 0:
+                return None
+            return [await self._read(reader) for _ in range(size)]
+        raise CacheUnavailable(f"unexpected reply {line!r}")
+
+
+class ResponseCache:
+    """
+    Versioned read-through cache over a CacheBackend.
+
+    Entries are tagged with the namespace version current when they were loaded,
+    and read together with that version in one round trip; `invalidate()` bumps
+    the version, so every worker sharing the backend stops serving older entries
+    at once. Concurrent misses for one key in this worker share a single load.
+    A backend that cannot be reached is treated as a miss.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], namespace: str, ttl: float):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self._version_key = f"{namespace}:version"
+        self._inflight: Dict[Tuple[str, bytes], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Optional[bytes]]], ttl: Optional[float] = None) -> Optional[bytes]:
+        """Cached value for `key`, or the result of `load()` (cached unless it is None)."""
+        if self.backend is None:
+            return await load()
+        entry_key = f"{self.namespace}:{key}"
+        try:
+            version, entry = await self.backend.get_many([self._version_key, entry_key])
+        except CacheUnavailable:
+            self.errors += 1
+            return await load()
+        tag = (version or b"0") + b":"
+        if entry is not None and entry.startswith(tag):
+            self.hits += 1
+            return entry[len(tag):]
+        self.misses += 1
+
+        flight = self._inflight.get((entry_key, tag))
+        if flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(flight)
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[(entry_key, tag)] = flight
+        try:
+            value = await load()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as exc:
+            flight.set_exception(exc)
+            # Waiters re-raise it; marking it retrieved keeps asyncio quiet when there are none
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+        finally:
+            del self._inflight[(entry_key, tag)]
+        if value is not None:
+            try:
+                await self.backend.set(entry_key, tag + value, ttl or self.ttl)
+            except CacheUnavailable:
+                self.errors += 1
+        return value
+
+    async def invalidate(self, ids=None):
+        """Drop every entry in the namespace, for all workers sharing the backend."""
+        self.invalidations += 1
+        if self.backend is None:
+            return
+        try:
+            await self.backend.incr(self._version_key)
+        except CacheUnavailable:
+            self.errors += 1
+            logger.warning("Could not invalidate the %s cache; entries expire within %ss", self.namespace, self.ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **(self.backend.stats() if self.backend is not None else {"backend": "none"}),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+# Backend selected by CACHE_BACKEND, shared by every response cache in this worker
+def create_backend() -> Optional[CacheBackend]:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_URL)
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    return None
+
+
+cache_backend = create_backend()
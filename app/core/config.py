@@ -0,0 +1,107 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file before anything reads them
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class Settings:
+    """Application settings read from the environment."""
+
+    def __init__(self):
+        self.DATABASE_URL = os.getenv("DATABASE_URL")
+        # JWT signing and token lifetimes
+        self.SECRET_KEY = os.getenv("SECRET_KEY")
+        self.JWT_ALGORITHM = "HS256"
+        self.ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+        self.REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 1440))
+        self.PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+        self.PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+        # How soon a revocation made by another worker applies here, and how often expired ones are pruned
+        self.TOKEN_REVOCATION_POLL_SECONDS = float(os.getenv("TOKEN_REVOCATION_POLL_SECONDS", 2))
+        self.TOKEN_REVOCATION_FULL_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_FULL_SYNC_SECONDS", 300))
+        # Server: `python run.py --production` preforks WEB_CONCURRENCY workers (default: one per core)
+        self.HOST = os.getenv("HOST", "127.0.0.1")
+        self.PORT = int(os.getenv("PORT", 8000))
+        self.WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+        # Seconds a stopping worker gets to finish its in-flight requests
+        self.GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+        # Serve requests through the asyncpg engine (opt-in); off keeps the sync psycopg2 path
+        self.DB_ASYNC = _env_bool("DB_ASYNC", False)
+        # Connection pool, per engine and per worker process
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+        self.DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+        self.DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+        self.DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+        # Connections all workers together may open per engine; each worker's pool is capped at its share (0: no cap)
+        self.DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 0))
+        if self.DB_MAX_CONNECTIONS:
+            share = max(1, self.DB_MAX_CONNECTIONS // self.WEB_CONCURRENCY)
+            self.DB_POOL_SIZE = min(self.DB_POOL_SIZE, share)
+            self.DB_MAX_OVERFLOW = min(self.DB_MAX_OVERFLOW, share - self.DB_POOL_SIZE)
+        # Threads per worker for sync endpoints and, with DB_ASYNC off, repository calls; more than
+        # the pool can serve would only queue on connection checkout
+        self.THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 40 if self.DB_ASYNC else self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW))
+        # Password hashing: bcrypt cost and the dedicated process pool that runs it
+        self.BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+        self.PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2 // self.WEB_CONCURRENCY)))
+        self.PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", self.PASSWORD_HASH_WORKERS * 16))
+        # How long a worker trusts its job facet counts without re-reading them
+        self.JOB_FACETS_TTL_SECONDS = float(os.getenv("JOB_FACETS_TTL_SECONDS", 300))
+        # Response cache for job reads: "memory" (per worker), "redis" (shared by all workers) or "none"
+        self.CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+        self.CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+        self.CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 30))
+        self.CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+        # How often each worker checks whether its public job board snapshot is behind the database
+        self.PUBLIC_JOBS_POLL_SECONDS = float(os.getenv("PUBLIC_JOBS_POLL_SECONDS", 5))
+        # How long the snapshot waits after a job write before patching, so a burst of writes is re-read and compressed once
+        self.PUBLIC_JOBS_PATCH_DELAY_SECONDS = float(os.getenv("PUBLIC_JOBS_PATCH_DELAY_SECONDS", 0.2))
+        # How often the expiry scheduler closes active jobs past their last_date (0 turns it off), and how many per UPDATE
+        self.JOB_EXPIRY_INTERVAL_SECONDS = float(os.getenv("JOB_EXPIRY_INTERVAL_SECONDS", 60))
+        self.JOB_EXPIRY_BATCH_SIZE = int(os.getenv("JOB_EXPIRY_BATCH_SIZE", 500))
+        # Write-behind audit log: queued events per worker, events per INSERT, the longest an event waits
+        # to be written, and how long a mutation waits for room when the queue is full
+        self.AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+        self.AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+        self.AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", 1))
+        self.AUDIT_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT_SECONDS", 5))
+        # Token-bucket limits on the auth endpoints, as "<requests>/<second|minute|hour|day>" ("0" turns one off).
+        # "memory" keeps buckets per worker, "redis" shares them through RATE_LIMIT_URL, "none" disables limiting.
+        self.RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower()
+        self.RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL", self.CACHE_URL)
+        self.RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+        self.RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "30/minute")
+        self.RATE_LIMIT_LOGIN_ACCOUNT = os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", "10/minute")
+        self.RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "5/minute")
+        self.RATE_LIMIT_REFRESH_IP = os.getenv("RATE_LIMIT_REFRESH_IP", "60/minute")
+        # Proxies (IPs or networks, comma-separated, or "*") whose X-Forwarded-For names the client for the per-IP limits.
+        # Empty ignores the header, so clients cannot pick their own bucket when nothing in front sets it.
+        self.FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "")
+        # Per-phase Server-Timing header on every response
+        self.SERVER_TIMING = _env_bool("SERVER_TIMING", True)
+        # Bearer token required by /metrics; empty leaves it open to the scraper's network
+        self.METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+        # Per-route query budgets and repeated-statement detection: "off", "warn" (log) or "raise" (dev/test).
+        # Checked after the response is sent, so neither mode changes what the client receives
+        self.QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off").strip().lower()
+        # How many times one statement may run in a request before it is reported as a likely N+1
+        self.QUERY_REPEAT_LIMIT = int(os.getenv("QUERY_REPEAT_LIMIT", 1))
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """The process-wide settings, read from the environment once."""
+    return Settings()
+
+
+settings = get_settings()
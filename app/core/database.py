@@ -1,24 +1,133 @@
-import os
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Union
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.pool_metrics import PoolMetrics
+from app.core.timing import instrument_queries
 
 # Load the database URL from environment variables
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+# Pool settings shared by both engines
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+}
+
+# Live pool statistics, served by /api/v1/internal/stats/
+pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
 
 # Create the database engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool_metrics.pool_class(QueuePool), **POOL_OPTIONS)
+pool_metrics.instrument(engine)
+instrument_queries(engine)
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on asyncpg, used for request handling when DB_ASYNC is on
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg"),
+        poolclass=async_pool_metrics.pool_class(AsyncAdaptedQueuePool),
+        **POOL_OPTIONS,
+    )
+    async_pool_metrics.instrument(async_engine.sync_engine)
+    instrument_queries(async_engine.sync_engine)
+    # Objects stay readable after commit; an expired attribute would need I/O outside the greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Either kind of session, as handed out by get_db
+DBSession = Union[Session, AsyncSession]
+
 # Base class for SQLAlchemy models
 Base = declarative_base()
 
-def get_db():
+def get_sync_db():
     """Dependency function to get a database session."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency function to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+get_db = get_async_db if settings.DB_ASYNC else get_sync_db
+
+logger = logging.getLogger(__name__)
+
+# Async listeners(ids) per topic, run after a repository function commits changes to it
+_change_listeners: Dict[str, List[Callable[[List], Awaitable[None]]]] = {}
+
+def on_change(topic: str, listener: Callable[[List], Awaitable[None]]):
+    """Call `listener(ids)` after every committed write that marks `topic` as changed."""
+    _change_listeners.setdefault(topic, []).append(listener)
+
+def mark_changed(db: Session, topic: str, ids: Optional[Iterable] = None):
+    """Record, after a commit in a repository function, which rows of `topic` changed."""
+    db.info.setdefault("changes", {}).setdefault(topic, []).extend(ids or ())
+
+async def dispatch_changes(changes: Dict[str, List]):
+    """Notify the listeners of each changed topic; a failing listener never fails the write."""
+    for topic, ids in changes.items():
+        for listener in _change_listeners.get(topic, ()):
+            try:
+                await listener(ids)
+            except Exception:
+                logger.exception("Change listener for %s failed", topic)
+
+async def run_db(db: DBSession, fn, *args, **kwargs):
+    """
+    Run a repository function with the request's session.
+
+    Repository functions are written against a sync Session. With an AsyncSession
+    they run through run_sync, so the queries go over asyncpg on the event loop and
+    no thread is held; with a sync Session they run in the threadpool. Changes the
+    function marked with mark_changed are dispatched once it returns.
+    """
+    try:
+        if isinstance(db, AsyncSession):
+            return await db.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+    finally:
+        changes = db.info.pop("changes", None)
+        if changes:
+            await dispatch_changes(changes)
+
+async def run_in_session(fn, *args, **kwargs):
+    """Run a repository function in a session of its own, for work done outside a request."""
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await run_db(db, fn, *args, **kwargs)
+    db = SessionLocal()
+    try:
+        return await run_db(db, fn, *args, **kwargs)
+    finally:
+        await run_in_threadpool(db.close)
+
+def stream_partitions(db: DBSession, stmt):
+    """Execute a yield_per statement and iterate its batches (async iterator for an AsyncSession)."""
+    if isinstance(db, AsyncSession):
+        return _stream_partitions_async(db, stmt)
+    return db.scalars(stmt).partitions()
+
+async def _stream_partitions_async(db: AsyncSession, stmt):
+    result = await db.stream_scalars(stmt)
+    async for batch in result.partitions():
+        yield batch
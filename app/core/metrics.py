@@ -0,0 +1,141 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Default latency buckets in seconds (upper bounds; +Inf is implicit)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram, safe to observe from any thread."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count, maximum = self._sum, self._count, self._max
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+        return {
+            "count": count,
+            "sum": total,
+            "avg": total / count if count else 0.0,
+            "max": maximum,
+            "buckets": buckets,
+        }
+
+    def prometheus(self, name: str, labels: str = "") -> List[str]:
+        """Sample lines of this histogram in the Prometheus text format."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        sep = "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {total}")
+        lines.append(f"{name}_count{suffix} {count}")
+        return lines
+
+
+# Prometheus label set, e.g. method="GET",route="/api/v1/jobs/"
+def label_string(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class HistogramFamily:
+    """Histograms keyed by label values, created on first observation."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._series: Dict[Tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Histogram:
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, Histogram(self.buckets))
+        return series
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            lines.extend(series.prometheus(self.name, label_string(**dict(zip(self.label_names, values)))))
+        return lines
+
+
+class CounterFamily:
+    """Monotonic counters keyed by label values."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values, amount: float = 1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, value in items:
+            lines.append(f"{self.name}{{{label_string(**dict(zip(self.label_names, values)))}}} {value}")
+        return lines
+
+
+class GaugeFamily:
+    """Gauges keyed by label values that go up and down."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, *values, amount: float = 1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, value in items:
+            lines.append(f"{self.name}{{{label_string(**dict(zip(self.label_names, values)))}}} {value}")
+        return lines
@@ -0,0 +1,112 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.core.metrics import Histogram
+
+
+class PoolMetrics:
+    """
+    Connection pool instrumentation fed by SQLAlchemy pool events.
+
+    Checkout wait is measured around Pool.connect() by the pool class returned from
+    `pool_class()`; everything else comes from the connect/checkout/checkin/close events.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkout_wait = Histogram()
+        self.connects = 0
+        self.closes = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self._connected_at = {}
+        self._lock = threading.Lock()
+
+    def pool_class(self, base):
+        """Subclass `base` so every checkout records how long it waited for a connection."""
+        metrics = self
+
+        def connect(pool):
+            metrics.pool = pool
+            start = time.perf_counter()
+            try:
+                return base.connect(pool)
+            except PoolTimeoutError:
+                with metrics._lock:
+                    metrics.timeouts += 1
+                raise
+            finally:
+                metrics.checkout_wait.observe(time.perf_counter() - start)
+
+        return type(f"Timed{base.__name__}", (base,), {"connect": connect})
+
+    def instrument(self, engine):
+        """Attach the pool event listeners to a (sync) Engine."""
+        self.pool = engine.pool
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "close_detached", self._on_close_detached)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+            self._connected_at[id(dbapi_connection)] = time.monotonic()
+
+    # Pool events fire on whichever thread checks a connection out or in; `+=` is not atomic across threads
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self._forget(dbapi_connection)
+
+    def _on_close_detached(self, dbapi_connection):
+        self._forget(dbapi_connection)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def _forget(self, dbapi_connection):
+        with self._lock:
+            self.closes += 1
+            self._connected_at.pop(id(dbapi_connection), None)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - connected_at for connected_at in self._connected_at.values()]
+            counts = {
+                "connects": self.connects,
+                "closes": self.closes,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+            }
+        pool = self.pool
+        return {
+            "pool_size": pool.size() if pool is not None else 0,
+            "checked_out": pool.checkedout() if pool is not None else 0,
+            "checked_in": pool.checkedin() if pool is not None else 0,
+            # QueuePool counts overflow from -pool_size; only connections beyond the pool matter here
+            "overflow": max(pool.overflow(), 0) if pool is not None else 0,
+            **counts,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+            "connection_age_seconds": {
+                "open": len(ages),
+                "max": max(ages, default=0.0),
+                "avg": sum(ages) / len(ages) if ages else 0.0,
+            },
+        }
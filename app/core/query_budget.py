@@ -0,0 +1,54 @@
+import logging
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more SQL statements than its route allows, or repeated one (QUERY_BUDGET_MODE=raise)."""
+
+
+def query_budget(max_queries: int):
+    """
+    Declare the most SQL statements one request to this route may run, with every
+    cache cold. Put it below the router decorator:
+
+        @router.get("/")
+        @query_budget(3)
+        async def get_jobs(...):
+    """
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorate
+
+
+# Statements run more than QUERY_REPEAT_LIMIT times in one request, most repeated first
+def repeated_statements(statements: Counter) -> List[Tuple[str, int]]:
+    return [(statement, count) for statement, count in statements.most_common() if count > settings.QUERY_REPEAT_LIMIT]
+
+
+def check_query_budget(route, query_count: int, statements: Optional[Counter]):
+    """
+    Warn about, or raise for, a request that went over its route's budget or repeated a statement.
+
+    Called by the timing middleware once the response has been sent: the client
+    still gets its response, the exception only surfaces in the server (and in
+    the test client, which re-raises it).
+    """
+    if route is None:
+        return
+    problems = []
+    budget = getattr(route.endpoint, "query_budget", None)
+    if budget is not None and query_count > budget:
+        problems.append(f"ran {query_count} queries, budget is {budget}")
+    for statement, count in repeated_statements(statements or Counter()):
+        problems.append(f"ran the same statement {count} times (possible N+1): {' '.join(statement.split())[:200]}")
+    if not problems:
+        return
+    message = f"{', '.join(sorted(route.methods or ()))} {route.path} " + "; ".join(problems)
+    if settings.QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
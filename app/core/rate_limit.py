@@ -0,0 +1,236 @@
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+from fastapi import Depends, HTTPException, Request, status
+from app.core.cache import CacheUnavailable, RedisBackend
+from app.core.config import settings
+
+
+class Rule(NamedTuple):
+    """Allow `burst` requests at once, refilled at `rate` requests per second."""
+    name: str
+    rate: float
+    burst: int
+
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Parse "10/minute" into a rule allowing bursts of 10, refilled over a minute; "" or "0" turns it off
+def parse_rule(name: str, spec: str) -> Optional[Rule]:
+    spec = (spec or "").strip().lower()
+    if spec in ("", "0", "off"):
+        return None
+    count, _, period = spec.partition("/")
+    try:
+        burst, seconds = int(count), PERIODS[period or "second"]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit for {name}: {spec!r} (expected e.g. 10/minute)")
+    return Rule(name, burst / seconds, burst)
+
+
+class TrustedProxies(NamedTuple):
+    """Peers whose X-Forwarded-For is believed: `everyone` ("*") or the listed networks."""
+    everyone: bool
+    networks: List
+
+    def trusts(self, host: str) -> bool:
+        if self.everyone:
+            return True
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks)
+
+
+# Parse "10.0.0.1, 10.1.0.0/16" (or "*") into the proxies to trust; "" trusts none
+def parse_proxies(spec: str) -> TrustedProxies:
+    entries = [entry.strip() for entry in (spec or "").split(",") if entry.strip()]
+    if "*" in entries:
+        return TrustedProxies(True, [])
+    try:
+        return TrustedProxies(False, [ipaddress.ip_network(entry, strict=False) for entry in entries])
+    except ValueError:
+        raise ValueError(f"Invalid FORWARDED_ALLOW_IPS: {spec!r} (expected IP addresses or networks, or *)")
+
+
+class MemoryBucketStore:
+    """
+    Token buckets for this worker, split over independently locked shards.
+
+    Each bucket is a (tokens, last refill) pair refilled lazily on the next take,
+    so idle keys cost nothing. Each shard is an LRU bounded to its share of
+    `max_keys`; evicting an idle bucket only forgets that it was partly drained.
+    """
+
+    SHARDS = 16
+
+    def __init__(self, max_keys: int):
+        self.max_keys_per_shard = max(1, max_keys // self.SHARDS)
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(self.SHARDS)]
+        self.evictions = 0
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; return 0 when allowed, else the seconds until one is available."""
+        lock, buckets = self._shards[hash(key) % self.SHARDS]
+        now = time.monotonic()
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                tokens = burst
+                if len(buckets) >= self.max_keys_per_shard:
+                    buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                buckets.move_to_end(key)
+            if tokens >= 1:
+                buckets[key] = (tokens - 1, now)
+                return 0.0
+            buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "keys": sum(len(buckets) for _, buckets in self._shards),
+            "max_keys": self.max_keys_per_shard * self.SHARDS,
+            "evictions": self.evictions,
+        }
+
+
+class RedisBucketStore:
+    """Token buckets shared by all workers, one hash per key updated atomically by a script."""
+
+    # Returns the milliseconds until a token is available (0: taken). Uses the server's clock,
+    # so workers on different hosts agree; idle buckets expire once they would be full again.
+    SCRIPT = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = math.ceil((1 - tokens) * 1000 / rate) end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate))
+return wait
+"""
+
+    def __init__(self, backend: RedisBackend, namespace: str = "ratelimit"):
+        self.backend = backend
+        self.namespace = namespace
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        return await self.backend.eval(self.SCRIPT, [f"{self.namespace}:{key}"], [rate, burst]) / 1000
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+class RateLimiter:
+    """
+    Token-bucket limits keyed by client IP or account, checked before any auth work.
+
+    With a shared store every worker draws from the same buckets; when it cannot
+    be reached, this worker's memory store takes over, so limits loosen to
+    per-worker instead of disappearing.
+    """
+
+    def __init__(self, local: MemoryBucketStore, shared: Optional[RedisBucketStore] = None):
+        self.local = local
+        self.shared = shared
+        self.allowed = 0
+        self.rejected = 0
+        self.fallbacks = 0
+
+    async def wait_time(self, rule: Rule, key: str) -> float:
+        bucket = f"{rule.name}:{key}"
+        if self.shared is not None:
+            try:
+                return await self.shared.take(bucket, rule.rate, rule.burst)
+            except CacheUnavailable:
+                self.fallbacks += 1
+        return self.local.take(bucket, rule.rate, rule.burst)
+
+    async def enforce(self, rule: Optional[Rule], key: str):
+        """Raise 429 with Retry-After when `key` has used up `rule`."""
+        if rule is None:
+            return
+        wait = await self.wait_time(rule, key)
+        if wait <= 0:
+            self.allowed += 1
+            return
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+    async def close(self):
+        if self.shared is not None:
+            await self.shared.backend.close()
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "fallbacks": self.fallbacks,
+            "local": self.local.stats(),
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    if settings.RATE_LIMIT_BACKEND == "none":
+        return None
+    shared = RedisBucketStore(RedisBackend(settings.RATE_LIMIT_URL)) if settings.RATE_LIMIT_BACKEND == "redis" else None
+    return RateLimiter(MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS), shared)
+
+
+rate_limiter = create_rate_limiter()
+
+login_ip = parse_rule("login_ip", settings.RATE_LIMIT_LOGIN_IP)
+login_account = parse_rule("login_account", settings.RATE_LIMIT_LOGIN_ACCOUNT)
+register_ip = parse_rule("register_ip", settings.RATE_LIMIT_REGISTER_IP)
+refresh_ip = parse_rule("refresh_ip", settings.RATE_LIMIT_REFRESH_IP)
+
+trusted_proxies = parse_proxies(settings.FORWARDED_ALLOW_IPS)
+
+
+# Enforce `rule` for any key, e.g. the account being logged into
+async def limit(rule: Optional[Rule], key: str):
+    if rate_limiter is not None:
+        await rate_limiter.enforce(rule, key)
+
+
+# The address a request came from. X-Forwarded-For is read only when the peer is a trusted proxy,
+# right to left: each proxy appends the address it was connected from, so the first hop that is
+# not a trusted proxy is the client and anything left of it may have been made up by that client.
+def client_ip(request: Request, proxies: Optional[TrustedProxies] = None) -> Optional[str]:
+    if proxies is None:
+        proxies = trusted_proxies
+    host = request.client.host if request.client is not None else None
+    if host is None or not proxies.trusts(host):
+        return host
+    hops = [hop.strip() for header in request.headers.getlist("x-forwarded-for") for hop in header.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not proxies.trusts(hop):
+            return hop
+        host = hop
+    return host
+
+
+def limit_by_ip(rule: Optional[Rule]):
+    """Route dependency enforcing `rule` per client IP, before the handler does any work."""
+    async def dependency(request: Request):
+        host = client_ip(request)
+        if host is not None:
+            await limit(rule, host)
+    return Depends(dependency)
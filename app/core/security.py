@@ -1,15 +1,99 @@
-from passlib.context import CryptContext
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from passlib.hash import bcrypt
 from datetime import datetime, timedelta
+from fastapi import HTTPException, status
 from jose import jwt
 from app.core.config import settings
+from app.core.timing import timed
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# The two functions below run inside the hashing worker processes
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def _verify(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    if not bcrypt.verify(password, hashed_password):
+        return False, None
+    # Rehash while we hold the plain password if the configured cost has changed
+    if bcrypt.from_string(hashed_password).rounds != rounds:
+        return True, _hash(password, rounds)
+    return True, None
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated, size-limited process pool.
+
+    Hashing never occupies the event loop or the request threadpool. When more than
+    `max_pending` operations are queued or running, new ones are rejected at once
+    with 503 instead of waiting behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+
+    def start(self):
+        if self._executor is None:
+            # spawn: the workers must not inherit the server's sockets, threads or pools
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.start()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Return (valid, new_hash); new_hash is set when the stored hash used another cost."""
+        return await self._submit(_verify, password, hashed_password, self.rounds)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+)
+
+async def hash_password(password: str) -> str:
+    with timed("hash"):
+        return await password_hasher.hash(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    with timed("hash"):
+        return await password_hasher.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: timedelta):
     to_encode = data.copy()
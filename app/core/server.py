@@ -0,0 +1,51 @@
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _post_fork(server, worker):
+    # Never share pooled connections opened before the fork; each worker opens its own
+    from app.core.database import async_engine, engine
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+def serve_production():
+    """
+    Serve the app with gunicorn: WEB_CONCURRENCY Uvicorn workers forked from a master
+    that imported the app once (preload), so workers start without repeating the
+    imports and share the loaded code copy-on-write. A stopping worker gets
+    GRACEFUL_TIMEOUT seconds to finish its requests and run the lifespan shutdown.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("Production mode needs gunicorn (pip install gunicorn), which does not run on Windows")
+    from app.main import app
+
+    class Server(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    options = {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": settings.WEB_CONCURRENCY,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "timeout": max(30, settings.GRACEFUL_TIMEOUT),
+        "keepalive": 5,
+        "post_fork": _post_fork,
+    }
+    logger.info("Starting %d workers at %s", settings.WEB_CONCURRENCY, options["bind"])
+    Server(options).run()
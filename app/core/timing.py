@@ -0,0 +1,170 @@
+import contextvars
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.metrics import LATENCY_BUCKETS, CounterFamily, GaugeFamily, HistogramFamily, label_string
+from app.core.query_budget import check_query_budget
+
+# Buckets for single statements, which are mostly well under a millisecond
+QUERY_BUCKETS = (0.0001, 0.00025) + LATENCY_BUCKETS
+
+http_requests = CounterFamily("http_requests_total", "Requests served, by route and status.", ("method", "route", "status"))
+http_duration = HistogramFamily("http_request_duration_seconds", "Time from request start to the last response byte.", ("method", "route"))
+http_in_flight = GaugeFamily("http_requests_in_flight", "Requests currently being served.", ("method",))
+db_queries = CounterFamily("db_queries_total", "SQL statements executed, by the route that issued them.", ("route",))
+db_query_duration = HistogramFamily("db_query_duration_seconds", "Duration of single SQL statements.", (), buckets=QUERY_BUCKETS)
+request_phase_duration = HistogramFamily("http_request_phase_duration_seconds", "Time per request spent in each phase.", ("route", "phase"))
+
+# Statements run outside a request (background tasks, migrations) are counted under this route
+NO_ROUTE = "-"
+
+
+class RequestTiming:
+    """Time spent by one request in each phase; filled in by timed() and the SQLAlchemy hooks."""
+
+    __slots__ = ("started", "phases", "db_count", "db_time", "db_nested", "statements")
+
+    def __init__(self, track_statements: bool = False):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.db_count = 0
+        self.db_time = 0.0
+        # Query time already included in a phase (e.g. the user lookup inside "auth")
+        self.db_nested = 0.0
+        # SQL text -> executions, only while query budgets are checked
+        self.statements: Optional[Counter] = Counter() if track_statements else None
+
+    def header(self) -> str:
+        """Server-Timing value; "app" is whatever the other phases and the queries do not cover."""
+        total = time.perf_counter() - self.started
+        entries = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in self.phases.items()]
+        entries.append(f'db;dur={self.db_time * 1000:.2f};desc="{self.db_count} queries"')
+        other = total - sum(self.phases.values()) - (self.db_time - self.db_nested)
+        entries.append(f"app;dur={max(other, 0.0) * 1000:.2f}")
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+current_timing: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar("current_timing", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the time spent in the block to `phase` of the current request, if there is one."""
+    timing = current_timing.get()
+    if timing is None:
+        yield
+        return
+    db_time = timing.db_time
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[phase] = timing.phases.get(phase, 0.0) + time.perf_counter() - start
+        timing.db_nested += timing.db_time - db_time
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware that times every HTTP request.
+
+    Adds a Server-Timing header (auth, hash, serialize, db, app, total) and feeds
+    the /metrics families. The request's RequestTiming travels in a contextvar, so
+    it follows the request into the threadpool and into run_sync.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timing = RequestTiming(track_statements=settings.QUERY_BUDGET_MODE != "off")
+        token = current_timing.set(timing)
+        method = scope["method"]
+        status = 500
+        http_in_flight.add(method)
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING:
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.header().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timing.reset(token)
+            http_in_flight.add(method, amount=-1)
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            elapsed = time.perf_counter() - timing.started
+            http_requests.inc(method, route, str(status))
+            http_duration.labels(method, route).observe(elapsed)
+            db_queries.inc(route, amount=timing.db_count)
+            request_phase_duration.labels(route, "db").observe(timing.db_time)
+            for phase, seconds in timing.phases.items():
+                request_phase_duration.labels(route, phase).observe(seconds)
+        # The response has already gone out, so a request over budget is reported, never refused;
+        # in raise mode the exception fails the test that made the request
+        if timing.statements is not None:
+            check_query_budget(scope.get("route"), timing.db_count, timing.statements)
+
+
+def instrument_queries(engine):
+    """Time every statement run on a (sync) Engine and charge it to the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    db_query_duration.labels().observe(elapsed)
+    timing = current_timing.get()
+    if timing is None:
+        db_queries.inc(NO_ROUTE)
+        return
+    timing.db_count += 1
+    timing.db_time += elapsed
+    if timing.statements is not None:
+        timing.statements[statement] += 1
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection is not None else None
+    if started:
+        started.pop()
+
+
+# Everything /metrics serves, in the Prometheus text exposition format
+def render_metrics(pools=()) -> bytes:
+    lines = []
+    for family in (http_requests, http_duration, http_in_flight, db_queries, db_query_duration, request_phase_duration):
+        lines.extend(family.prometheus())
+    if pools:
+        lines.extend(_pool_lines(pools))
+    return ("\n".join(lines) + "\n").encode()
+
+
+# Connection pool gauges and checkout waits from each PoolMetrics
+def _pool_lines(pools):
+    connections = ["# HELP db_pool_connections Pooled connections by state.", "# TYPE db_pool_connections gauge"]
+    timeouts = ["# HELP db_pool_checkout_timeouts_total Checkouts that gave up waiting for a connection.", "# TYPE db_pool_checkout_timeouts_total counter"]
+    waits = ["# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection.", "# TYPE db_pool_checkout_wait_seconds histogram"]
+    for pool in pools:
+        stats = pool.stats()
+        for state in ("checked_out", "checked_in", "overflow"):
+            connections.append(f"db_pool_connections{{{label_string(pool=pool.name, state=state)}}} {stats[state]}")
+        timeouts.append(f"db_pool_checkout_timeouts_total{{{label_string(pool=pool.name)}}} {stats['timeouts']}")
+        waits.extend(pool.checkout_wait.prometheus("db_pool_checkout_wait_seconds", label_string(pool=pool.name)))
+    return connections + timeouts + waits
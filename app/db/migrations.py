@@ -0,0 +1,135 @@
+import hashlib
+import importlib.util
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+import psycopg2
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+# Repository root; migrations live in <root>/migrations
+ROOT = Path(__file__).resolve().parents[2]
+SQL_FOLDER = ROOT / "migrations" / "sql"
+PYTHON_FOLDER = ROOT / "migrations" / "pys"
+
+# Key of the Postgres advisory lock held while migrations are applied (any constant bigint)
+ADVISORY_LOCK_KEY = 0x6D6967726174
+
+
+class MigrationError(Exception):
+    """A migration failed, or an applied migration file was changed afterwards."""
+
+
+class Migration(NamedTuple):
+    name: str
+    path: Path
+    checksum: str
+
+
+# Every migration in the order it is applied: base SQL, SQL alters, then Python and Python alters
+def discover_migrations() -> List[Migration]:
+    files = [path for path in sorted(SQL_FOLDER.glob("*.sql")) if path.name != "latest.sql"]
+    files += sorted((SQL_FOLDER / "alter").glob("*.sql"))
+    files += sorted(PYTHON_FOLDER.glob("*.py"))
+    files += sorted((PYTHON_FOLDER / "alter").glob("*.py"))
+    return [Migration(path.name, path, hashlib.sha256(path.read_bytes()).hexdigest()) for path in files]
+
+
+# Applied migration name -> checksum (None for rows recorded before checksums existed); None when there is no table yet
+def read_applied(cursor) -> Optional[Dict[str, Optional[str]]]:
+    cursor.execute("SELECT to_regclass('migrations') IS NOT NULL, EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'migrations' AND column_name = 'checksum')")
+    has_table, has_checksum = cursor.fetchone()
+    if not has_table:
+        return None
+    cursor.execute(f"SELECT migration_name, {'checksum' if has_checksum else 'NULL'} FROM migrations")
+    return dict(cursor.fetchall())
+
+
+def ensure_migrations_table(cursor):
+    """Ensure that the migrations tracking table exists, with its checksum column."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS migrations (
+            id SERIAL PRIMARY KEY,
+            migration_name TEXT NOT NULL UNIQUE,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        ALTER TABLE migrations ADD COLUMN IF NOT EXISTS checksum TEXT;
+    """)
+
+
+# Applied migrations whose file no longer matches what was applied
+def changed_migrations(migrations: List[Migration], applied: Dict[str, Optional[str]]) -> List[str]:
+    return [m.name for m in migrations if applied.get(m.name) not in (None, m.checksum)]
+
+
+def apply_migration(conn, migration: Migration):
+    """Apply one migration and record it in the same transaction."""
+    logger.info("Applying migration: %s", migration.name)
+    try:
+        with conn, conn.cursor() as cursor:
+            if migration.path.suffix == ".sql":
+                cursor.execute(migration.path.read_text())
+            else:
+                spec = importlib.util.spec_from_file_location(f"migrations.pys.{migration.path.stem}", migration.path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                module.run(cursor)
+            cursor.execute("INSERT INTO migrations (migration_name, checksum) VALUES (%s, %s)", (migration.name, migration.checksum))
+    except Exception as exc:
+        raise MigrationError(f"Error applying migration {migration.name}: {exc}") from exc
+
+
+def run_migrations(database_url: str) -> List[str]:
+    """
+    Bring the schema up to date and return the names of the migrations applied.
+
+    The common case, nothing to do, costs one connection and two small queries
+    and takes no lock. Otherwise a session-level advisory lock serializes the
+    workers that start together: the first applies the pending migrations, each
+    in its own transaction, and the rest find nothing left to do once they get
+    the lock. A migration file edited after it was applied stops startup.
+    """
+    started = time.perf_counter()
+    migrations = discover_migrations()
+    # psycopg2 wants a libpq URL, without SQLAlchemy's "+driver" suffix
+    conn = psycopg2.connect(make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False))
+    try:
+        with conn, conn.cursor() as cursor:
+            applied = read_applied(cursor)
+        if applied is not None and all(applied.get(m.name) == m.checksum for m in migrations):
+            logger.info("Schema is up to date (%d migrations, %.1f ms)", len(migrations), (time.perf_counter() - started) * 1000)
+            return []
+
+        with conn, conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+        try:
+            with conn, conn.cursor() as cursor:
+                ensure_migrations_table(cursor)
+                applied = read_applied(cursor)
+                changed = changed_migrations(migrations, applied)
+                if changed:
+                    raise MigrationError(f"Applied migrations were modified afterwards: {', '.join(changed)}")
+                # Rows recorded before checksums existed adopt the checksum of the file on disk
+                for migration in migrations:
+                    if migration.name in applied and applied[migration.name] is None:
+                        cursor.execute("UPDATE migrations SET checksum = %s WHERE migration_name = %s", (migration.checksum, migration.name))
+
+            pending = [migration for migration in migrations if migration.name not in applied]
+            for migration in pending:
+                apply_migration(conn, migration)
+        finally:
+            try:
+                with conn, conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+            except psycopg2.Error:
+                # Closing the connection releases the lock as well
+                pass
+    except psycopg2.Error as exc:
+        raise MigrationError(str(exc)) from exc
+    finally:
+        conn.close()
+
+    logger.info("Applied %d migrations in %.1f ms", len(pending), (time.perf_counter() - started) * 1000)
+    return [migration.name for migration in pending]
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.database import Base
+
+class AuditEvent(Base):
+    __tablename__ = "audit_log"
+
+    id = Column(BigInteger, primary_key=True)
+    # When the change was made (UTC), not when the row was written
+    occurred_at = Column(DateTime, nullable=False)
+    # Who made it; both empty for changes made by the app itself (e.g. job expiry)
+    actor_id = Column(Integer, nullable=True)
+    actor_email = Column(String, nullable=True)
+    action = Column(String, nullable=False)
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(String, nullable=False)
+    changes = Column(JSONB, nullable=True)
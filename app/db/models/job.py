@@ -1,10 +1,16 @@
-from sqlalchemy import UUID, Column, String, Integer, Enum, DateTime, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import UUID, Column, Computed, String, Integer, Enum, DateTime, ARRAY
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 import uuid
 from datetime import datetime,timedelta,timezone
 from app.core.database import Base
  # Assuming Base is your SQLAlchemy declarative base
 
+# Now as stored: the timestamp columns are UTC without a time zone
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# The schema keeps these as VARCHAR with CHECK constraints, not Postgres enum types
 class Job(Base):
     __tablename__ = "jobs"
 
@@ -12,11 +18,19 @@ class Job(Base):
     title = Column(String, nullable=False)
     category = Column(String, nullable=False)
     experience_required = Column(Integer, nullable=False)
-    status = Column(Enum("active", "private", "closed", name="job_status"), default="private")
-    location = Column(Enum("remote", "hybrid", "onsite", name="job_location"), nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc)) # sets the time as now in UTC and converts it to IST timezone before storing it in the database
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc))
+    status = Column(Enum("active", "private", "closed", name="job_status", native_enum=False), default="private")
+    location = Column(Enum("remote", "hybrid", "onsite", name="job_location", native_enum=False), nullable=False)
+    created_at = Column(DateTime, default=_utcnow)
+    # Evaluated per write (not once at import); migration 009 also keeps it current for SQL-only writes
+    updated_at = Column(DateTime, nullable=False, default=_utcnow, onupdate=_utcnow)
     last_date = Column(DateTime, nullable=True)
-    timing = Column(Enum('full-time', 'part-time', 'contract', name='job_timing'), nullable=False)
+    timing = Column(Enum('full-time', 'part-time', 'contract', name='job_timing', native_enum=False), nullable=False)
     about = Column(String, nullable=False)
-    responsibilities = Column(ARRAY(String), nullable=True)
\ No newline at end of file
+    responsibilities = Column(ARRAY(String), nullable=True)
+    # Generated by Postgres (migration 008); deferred so normal job reads never load it
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(about, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(jobs_responsibilities_text(responsibilities), '')), 'C')",
+        persisted=True,
+    )))
@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from app.core.database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(BigInteger, primary_key=True)
+    # The denied token; None denies every token of the user issued up to revoked_at
+    jti = Column(String, unique=True, nullable=True)
+    user_id = Column(Integer, nullable=False)
+    revoked_at = Column(DateTime, nullable=False)
+    # When the tokens covered have all expired and the row can go
+    expires_at = Column(DateTime, nullable=False)
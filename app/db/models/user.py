@@ -9,4 +9,5 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
-    role = Column(Enum("editor","viewer","admin", name="user_role"), default="viewer")
+    # VARCHAR with a CHECK constraint in the schema, not a Postgres enum type
+    role = Column(Enum("editor","viewer","admin", name="user_role", native_enum=False), default="viewer")
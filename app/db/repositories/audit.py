@@ -0,0 +1,32 @@
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.api.v1.schemas.audit import AuditFilters
+from app.db.models.audit import AuditEvent
+from app.utils.pagination import InvalidCursor, decode_cursor, split_page
+
+# Write a batch of audit events with one multi-row INSERT
+def insert_audit_events_db(db: Session, events: List[dict]):
+    db.execute(insert(AuditEvent.__table__).values(events))
+    db.commit()
+
+# Get a page of audit events, newest first, continuing after the given cursor
+def get_audit_events_db(db: Session, filters: Optional[AuditFilters] = None, limit: int = 50, cursor: Optional[str] = None):
+    query = db.query(AuditEvent)
+    if filters is not None:
+        if filters.entity_type is not None:
+            query = query.filter(AuditEvent.entity_type == filters.entity_type)
+        if filters.entity_id is not None:
+            query = query.filter(AuditEvent.entity_id == filters.entity_id)
+        if filters.actor_id is not None:
+            query = query.filter(AuditEvent.actor_id == filters.actor_id)
+        if filters.action is not None:
+            query = query.filter(AuditEvent.action == filters.action)
+    if cursor:
+        (before,) = decode_cursor(cursor, 1)
+        try:
+            query = query.filter(AuditEvent.id < int(before))
+        except ValueError:
+            raise InvalidCursor(cursor)
+    events = query.order_by(AuditEvent.id.desc()).limit(limit + 1).all()
+    return split_page(events, limit, lambda event: (event.id,))
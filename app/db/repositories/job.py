@@ -1,17 +1,180 @@
 from sqlalchemy.orm import Session
-from app.api.v1.schemas.job import JobCreate
+from sqlalchemy import and_, any_, bindparam, cast, delete, func, insert, literal_column, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION
+from sqlalchemy.orm import load_only
+from app.core.database import DBSession, mark_changed, stream_partitions
+from app.api.v1.schemas.job import JobCreate, JobFilters, JobStatus
 from app.db.models.job import Job
 from app.db.models.user import User
+from app.utils.job import facet_key, job_facets
+from app.utils.pagination import InvalidCursor, decode_cursor, split_page
+from datetime import datetime
+from typing import List, Optional, Sequence
 from uuid import UUID
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-# Get all jobs with pagination
-def get_jobs_db(db: Session):
-    return db.query(Job).all()
+# Columns returned by core INSERT/UPDATE/DELETE ... RETURNING (everything a JobResponse needs)
+job_columns = tuple(column for column in Job.__table__.c if column.key != "search_vector")
 
-# Get a specific job by ID
-def get_job_by_id(db: Session, job_id: UUID):
-    job = db.query(Job).filter(Job.id == job_id).first()
+# Columns to select for a narrowed read: the requested fields plus the keys the query itself needs
+def job_field_columns(fields: Sequence[str], *required: str):
+    names = dict.fromkeys((*fields, *required))
+    return [Job.__table__.c[name] for name in names]
+
+# Apply the optional list filters to a job query
+def apply_job_filters(query, filters: Optional[JobFilters]):
+    if filters is None:
+        return query
+    if filters.status is not None:
+        query = query.filter(Job.status == filters.status)
+    if filters.location is not None:
+        query = query.filter(Job.location == filters.location)
+    if filters.timing is not None:
+        query = query.filter(Job.timing == filters.timing)
+    if filters.category is not None:
+        query = query.filter(Job.category == filters.category)
+    if filters.min_experience is not None:
+        query = query.filter(Job.experience_required >= filters.min_experience)
+    if filters.max_experience is not None:
+        query = query.filter(Job.experience_required <= filters.max_experience)
+    return query
+
+# Keyset of a job in list order (newest first, id breaks ties)
+def job_cursor_key(job: Job):
+    return job.created_at.isoformat(), job.id
+
+# Keep only the jobs after the given cursor in list order
+def apply_job_cursor(query, cursor: Optional[str]):
+    if not cursor:
+        return query
+    created_at, job_id = decode_cursor(cursor, 2)
+    try:
+        after = (datetime.fromisoformat(created_at), UUID(job_id))
+    except ValueError:
+        raise InvalidCursor(cursor)
+    # Row comparison lets Postgres seek straight into the (created_at, id) index
+    return query.filter(tuple_(Job.created_at, Job.id) < after)
+
+# Get a page of jobs, newest first, continuing after the given cursor.
+# With `fields`, only those columns are read and the page holds plain rows instead of Job objects.
+def get_jobs_db(db: Session, filters: Optional[JobFilters] = None, limit: int = 20, cursor: Optional[str] = None, fields: Optional[Sequence[str]] = None):
+    query = db.query(Job) if fields is None else db.query(*job_field_columns(fields, "created_at", "id", "updated_at"))
+    query = apply_job_cursor(apply_job_filters(query, filters), cursor)
+    jobs = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1).all()
+    return split_page(jobs, limit, job_cursor_key)
+
+# Newest updated_at and row count of the matching jobs (after the cursor, if any), without loading them.
+# Scans every matching row, so it is for background staleness checks, not per-request validators.
+def get_jobs_version_db(db: Session, filters: Optional[JobFilters] = None, cursor: Optional[str] = None):
+    query = apply_job_cursor(apply_job_filters(db.query(func.max(Job.updated_at), func.count()), filters), cursor)
+    return tuple(query.one())
+
+# Text search configuration used by the jobs.search_vector column
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# Keep only the search hits after the given cursor in rank order (best first, id breaks ties)
+def apply_search_cursor(stmt, rank, cursor: Optional[str]):
+    if not cursor:
+        return stmt
+    after_rank, job_id = decode_cursor(cursor, 2)
+    try:
+        after = (float(after_rank), UUID(job_id))
+    except ValueError:
+        raise InvalidCursor(cursor)
+    # Mixed directions rule out a row comparison; `rank` is the double the cursor was written from
+    return stmt.where(or_(rank < after[0], and_(rank == after[0], Job.id > after[1])))
+
+# Ranked full-text search over title, about and responsibilities, with structured filters.
+# Pages on a (rank, id) keyset, so concurrent writes cannot skip or repeat hits between pages;
+# each page still ranks every match to find its top rows.
+def search_jobs_db(db: Session, q: str, filters: Optional[JobFilters] = None, limit: int = 20, cursor: Optional[str] = None, fields: Optional[Sequence[str]] = None):
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # ts_rank_cd returns a real; ordering, comparing and writing the cursor all use the same double,
+    # so a rank read back from one page compares exactly on the next
+    rank = cast(func.ts_rank_cd(Job.search_vector, query), DOUBLE_PRECISION)
+    # Rank and page on the GIN index first, then build snippets only for the rows returned
+    hits = apply_search_cursor(
+        apply_job_filters(select(Job.id, rank.label("rank")).where(Job.search_vector.bool_op("@@")(query)), filters),
+        rank,
+        cursor,
+    )
+    hits = hits.order_by(rank.desc(), Job.id).limit(limit + 1).subquery("hits")
+    snippet = func.ts_headline(SEARCH_CONFIG, Job.about, query, "MaxFragments=2, MinWords=5, MaxWords=20, StartSel=<mark>, StopSel=</mark>")
+    entities = (Job,) if fields is None else job_field_columns(fields)
+    rows = (
+        db.query(*entities, hits.c.rank, snippet.label("snippet"), hits.c.id.label("hit_id"))
+        .join(hits, hits.c.id == Job.id)
+        .order_by(hits.c.rank.desc(), Job.id)
+        .all()
+    )
+    page, next_cursor = split_page(rows, limit, lambda row: (repr(row.rank), row.hit_id))
+    # (job, rank, snippet) either way; a narrowed row carries the job's columns itself
+    return [(row[0] if fields is None else row, row.rank, row.snippet) for row in page], next_cursor
+
+# Stream jobs in list order, one batch at a time
+def stream_jobs_db(db: DBSession, filters: Optional[JobFilters] = None, batch_size: int = 1000, fields: Optional[Sequence[str]] = None):
+    stmt = select(Job)
+    if fields is not None:
+        # Still Job objects (the stream yields scalars), with only these columns loaded
+        stmt = stmt.options(load_only(*(getattr(Job, name) for name in fields)))
+    stmt = apply_job_filters(stmt, filters).order_by(Job.created_at.desc(), Job.id.desc())
+    # yield_per opens a named server-side cursor, so only one batch is ever held in memory
+    return stream_partitions(db, stmt.execution_options(yield_per=batch_size))
+
+# Get the active jobs (optionally only those among `job_ids`) with the columns the public board shows
+def get_active_jobs_db(db: Session, job_ids: Optional[List[UUID]] = None):
+    stmt = select(*job_columns).where(Job.status == "active")
+    if job_ids is not None:
+        stmt = stmt.where(_ids_in(job_ids))
+    return db.execute(stmt).all()
+
+# Count jobs per (category, status, location, timing) in one aggregate query and cache the facets
+def load_job_facets_db(db: Session):
+    generation = job_facets.generation
+    columns = (Job.category, Job.status, Job.location, Job.timing)
+    rows = db.query(*columns, func.count()).group_by(*columns).all()
+    return job_facets.load(rows, generation)
+
+# Bind a list of job ids as one array parameter, for "id = ANY(:ids)"
+def _ids_in(ids: List[UUID]):
+    return Job.id == any_(bindparam("ids", value=list(ids), type_=ARRAY(Job.id.type)))
+
+# Run one UPDATE ... RETURNING that also returns each row's facet columns from before the update.
+# With `limit`, only that many matching rows are updated and rows locked by others are skipped.
+def _update_jobs_returning(db: Session, condition, values: dict, limit: Optional[int] = None):
+    old = select(Job.id, Job.category, Job.status, Job.location, Job.timing).where(condition)
+    if limit is None:
+        old = old.with_for_update()
+    else:
+        old = old.limit(limit).with_for_update(skip_locked=True)
+    old = old.subquery("old")
+    stmt = (
+        update(Job.__table__)
+        .where(Job.id == old.c.id)
+        .values(**values)
+        .returning(
+            *job_columns,
+            old.c.category.label("old_category"),
+            old.c.status.label("old_status"),
+            old.c.location.label("old_location"),
+            old.c.timing.label("old_timing"),
+        )
+    )
+    return db.execute(stmt).all()
+
+# Move each updated row's facet counts from its old key to its new one
+def _move_facets(rows):
+    for row in rows:
+        job_facets.move((row.old_category, row.old_status, row.old_location, row.old_timing), facet_key(row))
+
+# Get only the updated_at of a job, to validate a conditional GET without loading the row
+def get_job_version_db(db: Session, job_id: UUID):
+    return db.query(Job.updated_at).filter(Job.id == job_id).scalar()
+
+# Get a specific job by ID (with `fields`, as a plain row of those columns)
+def get_job_by_id(db: Session, job_id: UUID, fields: Optional[Sequence[str]] = None):
+    query = db.query(Job) if fields is None else db.query(*job_field_columns(fields, "id", "updated_at"))
+    job = query.filter(Job.id == job_id).first()
     if not job:
         return None
     return job
@@ -32,37 +195,80 @@ def create_job_db(db: Session, job_data: JobCreate):
         db.add(new_job) 
         db.commit()
         db.refresh(new_job)
+        job_facets.add(facet_key(new_job))
+        mark_changed(db, "jobs", [new_job.id])
         return new_job
     # except SQLAlchemyError:
         db.rollback()
         return None
 
-# Update a job posting
+# Update a job posting in a single UPDATE ... RETURNING
 def update_job_db(db: Session, job_id: UUID, job_data: JobCreate):
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
+    row = next(iter(_update_jobs_returning(db, Job.id == job_id, job_data.model_dump())), None)
+    db.commit()
+    if row is None:
         return None
-    for key, value in job_data.model_dump().items():
-        setattr(job, key, value)
+    _move_facets([row])
+    mark_changed(db, "jobs", [row.id])
+    return row
+
+# Change the status of a job posting in a single UPDATE ... RETURNING
+def change_job_status_db(db: Session, job_id: UUID, status: JobStatus):
+    row = next(iter(_update_jobs_returning(db, Job.id == job_id, {"status": status})), None)
     db.commit()
-    db.refresh(job)
-    return job
+    if row is None:
+        return None
+    _move_facets([row])
+    mark_changed(db, "jobs", [row.id])
+    return row
 
-# Change the status of a job posting
-def change_job_status_db(db: Session, job_id: UUID, status: str):
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
+# Delete a job posting in a single DELETE ... RETURNING
+def delete_job_by_id(db: Session, job_id: UUID):
+    row = db.execute(delete(Job.__table__).where(Job.id == job_id).returning(*job_columns)).first()
+    db.commit()
+    if row is None:
         return None
-    job.status = status
+    job_facets.remove(facet_key(row))
+    mark_changed(db, "jobs", [row.id])
+    return row
+
+# Close up to `limit` active jobs whose last_date has passed, in one UPDATE ... RETURNING;
+# last_date is stored as UTC without a time zone, like created_at
+def close_expired_jobs_db(db: Session, limit: int):
+    expired = (Job.status == "active") & (Job.last_date < func.timezone("utc", func.now()))
+    rows = _update_jobs_returning(db, expired, {"status": "closed"}, limit=limit)
     db.commit()
-    db.refresh(job)
-    return job
+    _move_facets(rows)
+    mark_changed(db, "jobs", [row.id for row in rows])
+    return rows
 
-# Delete a job posting
-def delete_job_by_id(db: Session, job_id: UUID):
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
+# Create many job postings with one multi-row INSERT ... RETURNING in a single transaction
+def bulk_create_jobs_db(db: Session, jobs: List[JobCreate]):
+    stmt = insert(Job.__table__).returning(*job_columns, sort_by_parameter_order=True)
+    try:
+        rows = db.execute(stmt, [job.model_dump() for job in jobs]).all()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         return None
-    db.delete(job)
+    for row in rows:
+        job_facets.add(facet_key(row))
+    mark_changed(db, "jobs", [row.id for row in rows])
+    return rows
+
+# Change the status of many job postings in one UPDATE ... WHERE id = ANY(...)
+def bulk_change_job_status_db(db: Session, job_ids: List[UUID], status: str):
+    rows = _update_jobs_returning(db, _ids_in(job_ids), {"status": status})
     db.commit()
-    return job
+    _move_facets(rows)
+    mark_changed(db, "jobs", [row.id for row in rows])
+    return rows
+
+# Delete many job postings in one DELETE ... WHERE id = ANY(...)
+def bulk_delete_jobs_db(db: Session, job_ids: List[UUID]):
+    rows = db.execute(delete(Job.__table__).where(_ids_in(job_ids)).returning(*job_columns)).all()
+    db.commit()
+    for row in rows:
+        job_facets.remove(facet_key(row))
+    mark_changed(db, "jobs", [row.id for row in rows])
+    return rows
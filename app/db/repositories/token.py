@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from typing import List, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.db.models.token import RevokedToken
+
+revoked_columns = tuple(RevokedToken.__table__.c)
+
+# Now, as stored: UTC without a time zone
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Deny tokens by (jti, expires_at) in one INSERT ... ON CONFLICT DO NOTHING RETURNING;
+# a jti that was already denied is left out of the result
+def revoke_tokens_db(db: Session, user_id: int, tokens: List[Tuple[str, datetime]]):
+    rows = [{"jti": jti, "user_id": user_id, "revoked_at": _utcnow(), "expires_at": expires_at} for jti, expires_at in tokens]
+    stmt = insert(RevokedToken.__table__).values(rows).on_conflict_do_nothing(index_elements=["jti"]).returning(*revoked_columns)
+    revoked = db.execute(stmt).all()
+    db.commit()
+    return revoked
+
+# Deny every token of a user issued until now
+def revoke_user_tokens_db(db: Session, user_id: int, expires_at: datetime):
+    stmt = insert(RevokedToken.__table__).values(user_id=user_id, revoked_at=_utcnow(), expires_at=expires_at).returning(*revoked_columns)
+    revoked = db.execute(stmt).first()
+    db.commit()
+    return revoked
+
+# Unexpired revocations added after the given id, oldest first
+def get_revocations_db(db: Session, after_id: int = 0):
+    stmt = select(*revoked_columns).where(RevokedToken.id > after_id, RevokedToken.expires_at > func.timezone("utc", func.now())).order_by(RevokedToken.id)
+    return db.execute(stmt).all()
+
+# Delete revocations whose tokens have all expired
+def prune_revocations_db(db: Session) -> int:
+    result = db.execute(delete(RevokedToken.__table__).where(RevokedToken.expires_at <= func.timezone("utc", func.now())))
+    db.commit()
+    return result.rowcount
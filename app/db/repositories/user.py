@@ -1,10 +1,11 @@
+from typing import Optional
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from app.core.database import DBSession, stream_partitions
 from app.db.models.user import User
-from app.api.v1.schemas.user import UserCreate
-from passlib.context import CryptContext
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.api.v1.schemas.user import MemberFilters, UserCreate
+from app.utils.pagination import InvalidCursor, decode_cursor, split_page
 
 # Get a user by their username
 def get_user_by_username(db: Session, username: str):
@@ -18,11 +19,72 @@ def get_user_by_email(db: Session, email: str):
 def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
-# Create a new user and store their information in the database
-def create_user(db: Session, user: UserCreate):
-    hashed_password = pwd_context.hash(user.password)
-    db_user = User(email=user.email, username=user.username, hashed_password=hashed_password, role=user.role)
-    db.add(db_user)
+# Apply the optional role filter and username/email search to a user query
+def apply_member_filters(query, filters: Optional[MemberFilters]):
+    if filters is None:
+        return query
+    if filters.role is not None:
+        query = query.filter(User.role == filters.role)
+    if filters.q:
+        # The search text is literal: escape LIKE wildcards typed by the user (backslash is Postgres' default escape)
+        text = filters.q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        # Prefix matches use the lower(...) text_pattern_ops indexes, substrings the trigram ones
+        pattern = f"{text}%" if filters.match == "prefix" else f"%{text}%"
+        query = query.filter(or_(
+            func.lower(User.username).like(pattern),
+            func.lower(User.email).like(pattern),
+        ))
+    return query
+
+# Get a page of users in id order, continuing after the given cursor
+def get_members_db(db: Session, filters: Optional[MemberFilters] = None, limit: int = 50, cursor: Optional[str] = None):
+    query = apply_member_filters(db.query(User), filters)
+    if cursor:
+        (after,) = decode_cursor(cursor, 1)
+        try:
+            query = query.filter(User.id > int(after))
+        except ValueError:
+            raise InvalidCursor(cursor)
+    users = query.order_by(User.id).limit(limit + 1).all()
+    return split_page(users, limit, lambda user: (user.id,))
+
+# Stream all users ordered by ID, one batch at a time
+def stream_users_db(db: DBSession, batch_size: int = 1000):
+    stmt = select(User).order_by(User.id).execution_options(yield_per=batch_size)
+    return stream_partitions(db, stmt)
+
+# Get the users holding a username or an email, in one query
+def get_users_by_username_or_email(db: Session, username: str, email: str):
+    return db.query(User).filter(or_(User.username == username, User.email == email)).all()
+
+# Create a new user from an already hashed password in a single INSERT ... ON CONFLICT DO NOTHING RETURNING;
+# None when the username or email is already taken
+def create_user(db: Session, user: UserCreate, hashed_password: str):
+    stmt = (
+        insert(User.__table__)
+        .values(email=user.email, username=user.username, hashed_password=hashed_password, role=user.role)
+        .on_conflict_do_nothing()
+        .returning(*User.__table__.c)
+    )
+    created = db.execute(stmt).first()
+    db.commit()
+    return created
+
+# Replace a user's stored password hash
+def update_user_password_hash_db(db: Session, user_id: int, hashed_password: str):
+    db.query(User).filter(User.id == user_id).update({User.hashed_password: hashed_password}, synchronize_session=False)
+    db.commit()
+
+# Change the role of a user in a single UPDATE ... RETURNING
+def update_user_role_db(db: Session, user_id: int, role: str):
+    stmt = update(User.__table__).where(User.id == user_id).values(role=role).returning(*User.__table__.c)
+    user = db.execute(stmt).first()
+    db.commit()
+    return user
+
+# Delete a user in a single DELETE ... RETURNING
+def delete_user_db(db: Session, user_id: int):
+    stmt = delete(User.__table__).where(User.id == user_id).returning(*User.__table__.c)
+    user = db.execute(stmt).first()
     db.commit()
-    db.refresh(db_user)
-    return db_user
+    return user
@@ -1,14 +1,44 @@
-import os
-from fastapi import FastAPI
-from dotenv import load_dotenv
+import anyio.to_thread
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.routes import auth,job,member, router as api_router  # Import your API routes
+from app.api.v1.routes import audit,auth,job,member,internal,public, router as api_router  # Import your API routes
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.database import async_engine, async_pool_metrics, pool_metrics
+from app.core.security import password_hasher
+from app.core.timing import TimingMiddleware, render_metrics
+from app.utils.audit import audit_log
+from app.utils.auth import token_denylist
+from app.utils.job_expiry import job_expiry
+from app.utils.job_snapshot import public_jobs
 
-# Load environment variables from a .env file
-load_dotenv()
+# Start and stop the worker pools that live alongside the app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Per worker: sync endpoints and, with DB_ASYNC off, repository calls run on these threads
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    audit_log.start()
+    password_hasher.start()
+    token_denylist.start()
+    public_jobs.start()
+    job_expiry.start()
+    yield
+    await job_expiry.stop()
+    await public_jobs.stop()
+    await token_denylist.stop()
+    password_hasher.shutdown()
+    # Last, so events recorded by the shutdown above are written too
+    await audit_log.stop()
+    if cache_backend is not None:
+        await cache_backend.close()
+    if rate_limiter is not None:
+        await rate_limiter.close()
 
 # Initialize FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow cross-origin requests
 app.add_middleware(
@@ -19,12 +49,27 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Outermost, so the Server-Timing total and /metrics latencies cover the whole stack
+app.add_middleware(TimingMiddleware)
+
 # Include API routers for different routes
 app.include_router(auth.router, prefix="/api/v1/users", tags=["Users"])  # Users-related routes
 app.include_router(job.router, prefix="/api/v1/jobs", tags=["Jobs"])  # Jobs-related routes
 app.include_router(member.router, prefix="/api/v1/members", tags=["Members"])  # Members-related routes
+app.include_router(internal.router, prefix="/api/v1/internal", tags=["Internal"])  # Runtime stats for operators
+app.include_router(public.router, prefix="/api/v1/public", tags=["Public"])  # Unauthenticated job board
+app.include_router(audit.router, prefix="/api/v1/audit", tags=["Audit"])  # Who changed which job or member
 # Root endpoint for basic health check
 
 @app.get("/")
 def read_root():
     return {"message": "Hello World! The backend server is running and live for API Testing."}
+
+
+# Prometheus scrape endpoint for this worker
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if settings.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return Response(status_code=401)
+    pools = [pool_metrics] + ([async_pool_metrics] if async_engine is not None else [])
+    return Response(content=render_metrics(pools), media_type="text/plain; version=0.0.4")
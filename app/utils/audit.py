@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import run_in_session
+from app.db.repositories.audit import insert_audit_events_db
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """
+    Write-behind audit trail of job and member mutations.
+
+    record() only builds the event and puts it on a bounded in-process queue; a
+    background task writes the queue to the audit_log table in multi-row INSERTs
+    of up to `batch_size` events, at least every `flush_interval` seconds. When
+    the queue is full (the database is slow or down) record() waits up to
+    `enqueue_timeout` seconds for room, so mutations slow down instead of the
+    queue growing without bound. stop() writes out everything still queued.
+    Events that cannot be written are logged in full, never dropped silently.
+    """
+
+    def __init__(self, max_pending: int, batch_size: int, flush_interval: float, enqueue_timeout: float, shutdown_timeout: float = 10):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: List[dict] = []
+        self._closing = False
+        self.recorded = 0
+        self.written = 0
+        self.batches = 0
+        self.waits = 0
+        self.lost = 0
+        self.errors = 0
+
+    async def record(self, actor, action: str, entity_type: str, entity_id, changes: Optional[dict] = None):
+        """Queue one event; `actor` is the current user, or None for changes the app makes itself."""
+        event = {
+            "occurred_at": datetime.now(timezone.utc).replace(tzinfo=None),
+            "actor_id": actor.id if actor is not None else None,
+            "actor_email": actor.email if actor is not None else None,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "changes": changes,
+        }
+        if self._task is None:
+            self._spill([event], "the audit writer is not running")
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.waits += 1
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self._spill([event], "the audit queue stayed full")
+                return
+        self.recorded += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush every queued event, waiting at most `shutdown_timeout` seconds."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        self._closing = True
+        self._wake.set()
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(task, self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            self._spill(self._inflight + self._drain(self._queue.qsize()), "the audit writer did not finish in time")
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "recorded": self.recorded,
+            "written": self.written,
+            "batches": self.batches,
+            "waits": self.waits,
+            "lost": self.lost,
+            "errors": self.errors,
+        }
+
+    async def _run(self):
+        while not (self._closing and self._queue.empty()):
+            if not self._closing and self._queue.qsize() < self.batch_size:
+                # Let a batch build up, unless it fills (or we are stopping) first
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+            batch = self._drain(self.batch_size)
+            if batch:
+                self._inflight = batch
+                await self._write(batch)
+                self._inflight = []
+
+    async def _write(self, batch: List[dict]):
+        delay = 0.5
+        while True:
+            try:
+                await run_in_session(insert_audit_events_db, batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception:
+                self.errors += 1
+                logger.exception("Could not write %d audit events", len(batch))
+                if self._closing:
+                    self._spill(batch, "the final audit flush failed")
+                    return
+            # Retry the same batch (sooner if we are stopping); meanwhile the queue fills and record() applies backpressure
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, 30)
+
+    def _drain(self, limit: int) -> List[dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    # Last resort for events that will not reach the table: keep them in the log
+    def _spill(self, events: List[dict], reason: str):
+        self.lost += len(events)
+        for event in events:
+            logger.error("Audit event not stored (%s): %s", reason, json.dumps(event, default=str))
+
+
+audit_log = AuditLog(
+    max_pending=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+)
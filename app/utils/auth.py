@@ -1,71 +1,141 @@
-import os
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
-from dotenv import load_dotenv
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.db.repositories.user import get_user_by_email
-from app.core.database import get_db
+from app.db.repositories.token import revoke_tokens_db, revoke_user_tokens_db
+from app.db.repositories.user import get_user_by_email, get_users_by_username_or_email, update_user_password_hash_db
+from app.core.config import settings
+from app.core.database import DBSession, get_db, run_db
+from app.core.security import hash_password, verify_password
+from app.core.timing import timed
+from app.utils.principal_cache import Principal, PrincipalCache
+from app.utils.token_revocation import TokenDenylist
 import re
 
-# Load environment variables from .env file
-load_dotenv()
-
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 1440))
-
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-# Verify password using the hash
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# Verified access token -> principal, so warm requests skip the JWT decode and the user lookup
+principal_cache = PrincipalCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+# Revoked tokens, checked in memory; a revocation drops the user's cached principals
+token_denylist = TokenDenylist(
+    poll_interval=settings.TOKEN_REVOCATION_POLL_SECONDS,
+    full_sync_interval=settings.TOKEN_REVOCATION_FULL_SYNC_SECONDS,
+    on_revoke=principal_cache.invalidate_user,
+)
 
 # Authenticate user by comparing email and hashed password
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(db: DBSession, email: str, password: str):
+    user = await run_db(db, get_user_by_email, email)
+    if not user:
         return False
+    valid, new_hash = await verify_password(password, user.hashed_password)
+    if not valid:
+        return False
+    # Stored hash used a different bcrypt cost; replace it now that the password is known good
+    if new_hash:
+        await run_db(db, update_user_password_hash_db, user.id, new_hash)
     return user
 
+# Which of a new user's unique fields is already taken, as an error message (only run after a failed insert)
+async def user_conflict_message(db: DBSession, user) -> str:
+    existing = await run_db(db, get_users_by_username_or_email, user.username, user.email)
+    if any(found.username == user.username for found in existing):
+        return "Username already registered"
+    if any(found.email == user.email for found in existing):
+        return "Email already registered"
+    return "Username or email already registered"
+
 # Create an access token with an expiration date
 def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return _create_token(data, "access", expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
 
 # Create a refresh token with a separate expiration date
 def create_refresh_token(data: dict, expires_delta: timedelta = None):
+    return _create_token(data, "refresh", expires_delta or timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES))
+
+# Every token gets its own id (jti) to revoke it by, and a millisecond issue time
+# to compare with "revoke all sessions" cutoffs
+def _create_token(data: dict, token_type: str, expires_delta: timedelta):
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({
+        "exp": datetime.now(timezone.utc) + expires_delta,
+        "iat": round(time.time(), 3),
+        "jti": uuid.uuid4().hex,
+        "type": token_type,
+    })
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+# A fresh access and refresh token pair for a user
+def issue_tokens(user) -> dict:
+    claims = {"sub": user.email, "uid": user.id}
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims),
+        "token_type": "bearer",
+    }
+
+# Expiry of a token's claims, as stored in revoked_tokens
+def claims_expiry(claims: dict) -> datetime:
+    return datetime.fromtimestamp(claims["exp"], timezone.utc).replace(tzinfo=None)
+
+# Revoke the tokens with these claims; returns those that were not revoked already
+async def revoke_tokens(db: DBSession, user_id: int, claims_list: list) -> list:
+    if not claims_list:
+        return []
+    rows = await run_db(db, revoke_tokens_db, user_id, [(claims["jti"], claims_expiry(claims)) for claims in claims_list])
+    token_denylist.apply(rows)
+    return rows
+
+# Revoke every token issued to a user so far, in every worker
+async def revoke_sessions(db: DBSession, user_id: int):
+    # No token issued before now outlives the longest token lifetime
+    lifetime = timedelta(minutes=max(settings.ACCESS_TOKEN_EXPIRE_MINUTES, settings.REFRESH_TOKEN_EXPIRE_MINUTES))
+    expires_at = datetime.now(timezone.utc).replace(tzinfo=None) + lifetime
+    row = await run_db(db, revoke_user_tokens_db, user_id, expires_at)
+    token_denylist.apply([row])
+
+# Verified claims of a token, or None when it is invalid or expired
+def decode_token(token: str):
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
 
 # Get the current user from the token in the request header
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def get_current_user(db: DBSession = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    with timed("auth"):
+        return await resolve_principal(db, token)
+
+# Principal for a bearer token: from the cache, or by decoding it and loading the user
+async def resolve_principal(db: DBSession, token: str):
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        # Only access tokens; refresh tokens (and old tokens without a type) are not bearer credentials
+        if email is None or payload.get("type") != "access":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_email(db, email=email)
-    if user is None:
+    user = await run_db(db, get_user_by_email, email=email)
+    # Checked after the lookup, so a revocation that arrived meanwhile keeps the token out of the cache
+    if user is None or token_denylist.is_revoked(payload):
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, exp=payload.get("exp"))
+    return principal
 
 # Validate email using regex
 def validate_email(email: str) -> bool:
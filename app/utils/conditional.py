@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+
+# Clients must revalidate on every poll, but may reuse the body on a 304
+CACHE_CONTROL = "private, no-cache"
+
+
+# Stored timestamps are naive UTC
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+# Strong ETag of a single row: its id and the microsecond it was last written
+def row_etag(row_id, updated_at: datetime) -> str:
+    return f'"{row_id}-{int(as_utc(updated_at).timestamp() * 1_000_000):x}"'
+
+
+# Strong ETag of one page of a list, from the rows already fetched for it: which rows are on
+# the page, when each was last written, and whether more follow. Any write that changes the
+# page changes one of these, and computing it costs nothing beyond the page query itself.
+def page_etag(rows, has_more: bool) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for row in rows:
+        digest.update(f"{row.id}:{int(as_utc(row.updated_at).timestamp() * 1_000_000):x};".encode())
+    digest.update(b"+" if has_more else b".")
+    return f'"{digest.hexdigest()}"'
+
+
+# Does any entity tag in an If-None-Match header match ours?
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+# Should this request get a 304? If-None-Match wins over If-Modified-Since when both are sent
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return as_utc(last_modified).replace(microsecond=0) <= since
+
+
+# Does the request carry any validator worth checking before loading rows?
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+# Attach the validators to a response
+def with_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(as_utc(last_modified), usegmt=True)
+    return response
+
+
+# Empty 304 carrying the same validators a 200 would have
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    return with_validators(Response(status_code=304), etag, last_modified)
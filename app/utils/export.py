@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Type, Union
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, DBSession, SessionLocal
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Encode one batch of rows as newline-delimited JSON
+def ndjson_chunk(batch: Iterable, schema: Type[BaseModel]) -> bytes:
+    return "".join(schema.model_validate(row).model_dump_json() + "\n" for row in batch).encode()
+
+# Encode one batch of rows as CSV lines (lists are written as JSON arrays)
+def csv_chunk(batch: Iterable, schema: Type[BaseModel], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    fields = list(schema.model_fields)
+    if header:
+        writer.writerow(fields)
+    for row in batch:
+        values = schema.model_validate(row).model_dump()
+        writer.writerow([json.dumps(values[field]) if isinstance(values[field], list) else values[field] for field in fields])
+    return buffer.getvalue().encode()
+
+# Encode one batch in the requested export format
+def encode_chunk(batch: Iterable, schema: Type[BaseModel], export_format: str) -> bytes:
+    if export_format == "csv":
+        return csv_chunk(batch, schema)
+    return ndjson_chunk(batch, schema)
+
+# Stream every batch produced by `stream_db` to the client in the requested format
+def export_response(stream_db: Callable[[DBSession], Union[Iterator[List], AsyncIterator[List]]], schema: Type[BaseModel], export_format: str, filename: str):
+    # The request-scoped session is closed before the body is sent, so the
+    # export owns its session for as long as the server-side cursor is open.
+    def body():
+        with SessionLocal() as db:
+            if export_format == "csv":
+                yield csv_chunk([], schema, header=True)
+            for batch in stream_db(db):
+                yield encode_chunk(batch, schema, export_format)
+
+    async def async_body():
+        async with AsyncSessionLocal() as db:
+            if export_format == "csv":
+                yield csv_chunk([], schema, header=True)
+            async for batch in stream_db(db):
+                yield encode_chunk(batch, schema, export_format)
+
+    return StreamingResponse(
+        async_body() if settings.DB_ASYNC else body(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
@@ -1,2 +1,120 @@
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+from app.core.cache import ResponseCache, cache_backend
+from app.core.config import settings
+from app.core.database import on_change
 
-    
\ No newline at end of file
+# Columns the dashboard sidebar counts jobs by
+FACET_FIELDS = ("category", "status", "location", "timing")
+
+FacetKey = Tuple[str, str, str, str]
+
+
+# Facet key of a job (or any row with the facet columns)
+def facet_key(job) -> FacetKey:
+    return job.category, job.status, job.location, job.timing
+
+
+class JobFacetCache:
+    """
+    In-process job counts grouped by (category, status, location, timing).
+
+    Loaded with a single GROUP BY query; job writes in this process adjust the
+    counts in place instead of dropping them, so reads cost no database work
+    between writes. Writes made by other workers are picked up after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self._groups: Optional[Counter] = None
+        self._facets: Optional[dict] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[dict]:
+        """Current facets, or None when they have to be loaded."""
+        with self._lock:
+            if self._groups is None or time.monotonic() >= self._expires_at:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self._facets is None:
+                self._facets = _rollup(self._groups)
+            return self._facets
+
+    def load(self, rows: Iterable[Tuple[str, str, str, str, int]], generation: int) -> dict:
+        """
+        Install counts read from the database. `generation` is the value seen before
+        the query; if a write happened meanwhile the rows may be stale and are only
+        used for this one response.
+        """
+        groups = Counter({tuple(row[:4]): row[4] for row in rows})
+        facets = _rollup(groups)
+        with self._lock:
+            self.loads += 1
+            if generation == self.generation:
+                self._groups = groups
+                self._facets = facets
+                self._expires_at = time.monotonic() + self.ttl
+        return facets
+
+    def add(self, key: FacetKey, count: int = 1):
+        self._apply(((key, count),))
+
+    def remove(self, key: FacetKey, count: int = 1):
+        self._apply(((key, -count),))
+
+    def move(self, old: FacetKey, new: FacetKey):
+        if old != new:
+            self._apply(((old, -1), (new, 1)))
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._groups = None
+            self._facets = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._groups is not None,
+                "groups": len(self._groups) if self._groups is not None else 0,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+            }
+
+    def _apply(self, deltas):
+        with self._lock:
+            self.generation += 1
+            if self._groups is None:
+                return
+            for key, delta in deltas:
+                self._groups[key] += delta
+                if self._groups[key] <= 0:
+                    del self._groups[key]
+            self._facets = None
+
+
+def _rollup(groups: Counter) -> dict:
+    facets: Dict[str, Dict[str, int]] = {field: {} for field in FACET_FIELDS}
+    for key, count in groups.items():
+        for field, value in zip(FACET_FIELDS, key):
+            facets[field][value] = facets[field].get(value, 0) + count
+    facets["total"] = sum(groups.values())
+    return facets
+
+
+job_facets = JobFacetCache(ttl=settings.JOB_FACETS_TTL_SECONDS)
+
+
+# Serialized responses of the job read endpoints; any committed job write drops them all
+job_cache = ResponseCache(cache_backend, "jobs", ttl=settings.CACHE_TTL_SECONDS)
+on_change("jobs", job_cache.invalidate)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, run_db
+from app.db.repositories.job import close_expired_jobs_db
+from app.utils.audit import audit_log
+
+logger = logging.getLogger(__name__)
+
+# Key of the Postgres advisory lock held by the worker that runs the expiry (any constant bigint)
+LEADER_LOCK_KEY = 0x6A6F62657870
+
+
+class JobExpiryScheduler:
+    """
+    Closes active jobs whose last_date has passed, every `interval` seconds.
+
+    Every worker runs the loop, but only the one holding a session-level advisory
+    lock does the work; it keeps the lock on a dedicated connection, so another
+    worker takes over when it stops or its connection drops. Each run closes the
+    expired jobs in batches of `batch_size`, one UPDATE ... RETURNING and commit
+    per batch, and publishes the closed ids through the "jobs" change listeners
+    so the response cache and the public job board drop them at once.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.closed = 0
+        self.errors = 0
+        self.last_run_at: Optional[float] = None
+        self.last_run_seconds: Optional[float] = None
+        self.last_run_closed = 0
+
+    @property
+    def leader(self) -> bool:
+        return self._connection is not None
+
+    async def run_once(self) -> Optional[int]:
+        """Close every expired job if this worker leads; return how many, or None when it does not."""
+        if not await run_in_threadpool(self._lead):
+            return None
+        started = time.perf_counter()
+        closed = 0
+        db = SessionLocal(bind=self._connection)
+        try:
+            while True:
+                rows = await run_db(db, close_expired_jobs_db, self.batch_size)
+                closed += len(rows)
+                for row in rows:
+                    await audit_log.record(None, "job.expire", "job", row.id, {"status": {"from": row.old_status, "to": row.status}})
+                if len(rows) < self.batch_size:
+                    break
+        finally:
+            await run_in_threadpool(db.close)
+        self.runs += 1
+        self.closed += closed
+        self.last_run_at = time.time()
+        self.last_run_seconds = time.perf_counter() - started
+        self.last_run_closed = closed
+        if closed:
+            logger.info("Closed %d expired jobs in %.1f ms", closed, self.last_run_seconds * 1000)
+        return closed
+
+    def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Closing the connection hands the lock to another worker
+        await run_in_threadpool(self._resign)
+
+    def stats(self) -> dict:
+        return {
+            "leader": self.leader,
+            "interval_seconds": self.interval,
+            "batch_size": self.batch_size,
+            "runs": self.runs,
+            "closed": self.closed,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at,
+            "last_run_seconds": self.last_run_seconds,
+            "last_run_closed": self.last_run_closed,
+        }
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.errors += 1
+                logger.exception("Job expiry run failed")
+                # The connection may be gone; the next run competes for the lock again
+                await run_in_threadpool(self._resign)
+            await asyncio.sleep(self.interval)
+
+    # Runs in the threadpool: become the leader, or stay it
+    def _lead(self) -> bool:
+        if self._connection is not None:
+            return True
+        connection = engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": LEADER_LOCK_KEY}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    # Runs in the threadpool
+    def _resign(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            # Invalidate rather than return it to the pool, so the session-level lock goes with it
+            connection.invalidate()
+            connection.close()
+
+
+job_expiry = JobExpiryScheduler(interval=settings.JOB_EXPIRY_INTERVAL_SECONDS, batch_size=settings.JOB_EXPIRY_BATCH_SIZE)
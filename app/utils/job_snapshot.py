@@ -0,0 +1,161 @@
+import asyncio
+import contextvars
+import gzip
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from app.api.v1.schemas.job import JobFilters, PublicJobResponse
+from app.core.config import settings
+from app.core.database import on_change, run_in_session
+from app.db.repositories.job import get_active_jobs_db, get_jobs_version_db
+
+logger = logging.getLogger(__name__)
+
+# (created_at, id) for list order, updated_at for the staleness check, and the serialized job
+Entry = Tuple[Tuple[datetime, str], datetime, bytes]
+
+
+class PublicJobSnapshot:
+    """
+    Pre-serialized, pre-compressed list of active jobs for the public job board.
+
+    Each job is serialized once, when it changes: job writes in this worker record
+    the affected ids through the "jobs" change listener, and a background task
+    patches them shortly after, off the write's request. A background poll
+    compares max(updated_at) and count of active jobs with the snapshot to catch
+    writes made by other workers. Requests never touch the database.
+    """
+
+    def __init__(self, poll_interval: float, patch_delay: float, message: str = "Jobs fetched successfully"):
+        self.poll_interval = poll_interval
+        self.patch_delay = patch_delay
+        self._prefix = b'{"status":"success","message":' + json.dumps(message).encode() + b',"data":['
+        self._suffix = b'],"status_code":200}'
+        self._entries: Dict[str, Entry] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Ids written since the last patch, and the task that will patch them
+        self._dirty: Set[str] = set()
+        self._patch_task: Optional[asyncio.Task] = None
+        self.body: Optional[bytes] = None
+        self.gzip_body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.built_at = 0.0
+        self.rebuilds = 0
+        self.patches = 0
+        self.errors = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.body is not None
+
+    async def rebuild(self):
+        """Replace the whole snapshot with the active jobs in the database."""
+        async with self._lock:
+            rows = await run_in_session(get_active_jobs_db)
+            self._entries = dict(self._entry(row) for row in rows)
+            self.rebuilds += 1
+            self._publish()
+
+    async def apply(self, job_ids: List):
+        """Mark jobs as changed; they are re-read in the background, so the write never waits."""
+        if not self.ready or not job_ids:
+            return
+        self._dirty.update(str(job_id) for job_id in job_ids)
+        if self._patch_task is None:
+            # A fresh context, so the patch's queries are not charged to the request that wrote
+            self._patch_task = asyncio.create_task(self._patch_dirty(), context=contextvars.Context())
+
+    async def patch(self, job_ids: List[str]):
+        """Re-read only the jobs that changed; inactive or deleted ones drop out."""
+        async with self._lock:
+            try:
+                rows = await run_in_session(get_active_jobs_db, list(job_ids))
+            except Exception:
+                # The next poll sees the snapshot is behind and rebuilds it
+                self.errors += 1
+                logger.exception("Could not patch the public job snapshot")
+                return
+            for job_id in job_ids:
+                self._entries.pop(job_id, None)
+            self._entries.update(self._entry(row) for row in rows)
+            self.patches += 1
+            self._publish()
+
+    async def refresh_if_stale(self):
+        """Rebuild when the active jobs in the database differ from the snapshot."""
+        last_modified, count = await run_in_session(get_jobs_version_db, JobFilters(status="active"))
+        if not self.ready or (last_modified, count) != self._version():
+            await self.rebuild()
+
+    def start(self):
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        for task in (self._task, self._patch_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._patch_task = None
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "jobs": len(self._entries),
+            "bytes": len(self.body) if self.body else 0,
+            "gzip_bytes": len(self.gzip_body) if self.gzip_body else 0,
+            "age_seconds": time.monotonic() - self.built_at if self.ready else None,
+            "poll_interval_seconds": self.poll_interval,
+            "pending_patches": len(self._dirty),
+            "rebuilds": self.rebuilds,
+            "patches": self.patches,
+            "errors": self.errors,
+        }
+
+    async def _poll(self):
+        while True:
+            try:
+                await self.refresh_if_stale()
+            except Exception:
+                self.errors += 1
+                logger.exception("Could not refresh the public job snapshot")
+            await asyncio.sleep(self.poll_interval)
+
+    # Wait out a burst of writes, then patch everything marked in the meantime with one read and one publish
+    async def _patch_dirty(self):
+        try:
+            while self._dirty:
+                await asyncio.sleep(self.patch_delay)
+                job_ids, self._dirty = list(self._dirty), set()
+                await self.patch(job_ids)
+        finally:
+            self._patch_task = None
+
+    @staticmethod
+    def _entry(row) -> Tuple[str, Entry]:
+        job_id = str(row.id)
+        return job_id, ((row.created_at, job_id), row.updated_at, PublicJobResponse.model_validate(row).model_dump_json().encode())
+
+    def _version(self):
+        if not self._entries:
+            return None, 0
+        return max(entry[1] for entry in self._entries.values()), len(self._entries)
+
+    # Caller holds the lock
+    def _publish(self):
+        ordered = sorted(self._entries.values(), key=lambda entry: entry[0], reverse=True)
+        body = self._prefix + b",".join(entry[2] for entry in ordered) + self._suffix
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.body = body
+        self.built_at = time.monotonic()
+
+
+public_jobs = PublicJobSnapshot(poll_interval=settings.PUBLIC_JOBS_POLL_SECONDS, patch_delay=settings.PUBLIC_JOBS_PATCH_DELAY_SECONDS)
+on_change("jobs", public_jobs.apply)
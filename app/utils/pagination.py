@@ -0,0 +1,33 @@
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+# Encode the keyset values of the last row on a page into an opaque cursor
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([str(value) for value in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+# Decode a cursor back into its keyset values (as strings)
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    return values
+
+
+# Split a "limit + 1" fetch into the page and the cursor for the next page
+def split_page(rows: Sequence, limit: int, key: Callable[[Any], Tuple]) -> Tuple[list, Optional[str]]:
+    page = list(rows[:limit])
+    if len(rows) > limit and page:
+        return page, encode_cursor(*key(page[-1]))
+    return page, None
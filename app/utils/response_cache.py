@@ -0,0 +1,52 @@
+import json
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+from urllib.parse import urlencode
+from fastapi import Request
+from fastapi.responses import Response
+from app.core.cache import ResponseCache
+from app.utils.conditional import not_modified, not_modified_response
+
+# Response headers stored with a cached body
+CACHED_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+
+# Cache key of a GET: its path and its query parameters in a canonical order
+def request_key(request: Request) -> str:
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+
+# Serialize a 200 response as one JSON header line followed by the body
+def pack_response(response: Response) -> bytes:
+    headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+    return json.dumps(headers, separators=(",", ":")).encode() + b"\n" + response.body
+
+
+def unpack_response(data: bytes) -> Response:
+    header_line, body = data.split(b"\n", 1)
+    return Response(content=body, headers=json.loads(header_line))
+
+
+# Serve a GET from `cache`, building (and caching) it with `build()` on a miss.
+# Only 200s are cached; conditional requests are answered from the cached validators.
+async def cached_response(cache: ResponseCache, request: Request, build: Callable[[], Awaitable[Response]]) -> Response:
+    built = None
+
+    async def load():
+        nonlocal built
+        built = await build()
+        return pack_response(built) if built.status_code == 200 else None
+
+    data = await cache.get_or_load(request_key(request), load)
+    if data is None:
+        # Not cacheable; a request that joined someone else's load builds its own response
+        return built if built is not None else await build()
+    response = unpack_response(data)
+    response.headers["X-Cache"] = "MISS" if built is not None else "HIT"
+    etag = response.headers.get("etag")
+    if etag is not None:
+        last_modified = response.headers.get("last-modified")
+        last_modified = parsedate_to_datetime(last_modified) if last_modified else None
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+    return response
@@ -1,6 +1,8 @@
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Generic, TypeVar, Optional, List
+from functools import lru_cache
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, Generic, TypeVar, Optional, List
+from app.core.timing import timed
 
 T = TypeVar("T")
 
@@ -17,54 +19,72 @@ class PaginatedResponseModel(BaseModel, Generic[T]):
     pagination: Optional[dict]
     status_code: int
 
+
+# Type the envelope is specialized on: lists by their items, everything else by its class
+def payload_type(data: Any):
+    if data is None:
+        return None
+    if isinstance(data, list):
+        return List[item_type(data)] if data else list
+    return type(data)
+
+# The items' class when they all share it; a mixed list is serialized item by item, as JSONResponse did
+def item_type(items: list):
+    first = type(items[0])
+    return first if all(type(item) is first for item in items) else Any
+
+# Specialized envelope model and its serializer, built once per (envelope, payload type)
+@lru_cache(maxsize=256)
+def envelope(generic_model: type, item_type: Any):
+    model = generic_model[item_type]
+    return model, TypeAdapter(model)
+
+# Serialize an envelope straight to JSON bytes in one pass (no dict round trip)
+def render(generic_model: type, item_type: Any, status_code: int, **fields) -> Response:
+    with timed("serialize"):
+        model, adapter = envelope(generic_model, item_type)
+        body = adapter.dump_json(model.model_construct(status_code=status_code, **fields))
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
 class ResponseHandler:
     @staticmethod
     def success(data=None, message="Operation successful", status_code=200):
         """
         Generates a standardized success response.
         """
-        response = ResponseModel[
-            type(data) if data is not None else None
-        ](
-            status="success",
-            message=message,
-            data=data,
-            status_code=status_code
-        )
-        return JSONResponse(status_code=status_code, content=response.model_dump())
+        return render(ResponseModel, payload_type(data), status_code, status="success", message=message, data=data)
 
     @staticmethod
     def error(message="An error occurred", details=None, status_code=400):
         """
         Generates a standardized error response.
         """
-        response = ResponseModel[
-            type(details) if details is not None else None
-        ](
-            status="error",
-            message=message,
-            data=details,
-            status_code=status_code
-        )
-        return JSONResponse(status_code=status_code, content=response.model_dump())
+        return render(ResponseModel, payload_type(details), status_code, status="error", message=message, data=details)
 
     @staticmethod
-    def paginated(data: List[T], total_count: int, page: int, page_size: int, message="Data fetched successfully", status_code=200):
+    def paginated(data: List[T], page_size: int, next_cursor: Optional[str] = None, total_count: Optional[int] = None, page: Optional[int] = None, message="Data fetched successfully", status_code=200):
         """
         Generates a paginated response.
+        Keyset pages carry `next_cursor`; page-numbered lists also pass `total_count` and `page`.
         """
-        response = PaginatedResponseModel[
-            type(data[0]) if data else None
-        ](
-            status="success",
-            message=message,
-            data=data,
-            pagination={
+        pagination = {
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+        if total_count is not None:
+            pagination.update({
                 "total_count": total_count,
                 "current_page": page,
-                "page_size": page_size,
                 "total_pages": (total_count + page_size - 1) // page_size,
-            },
-            status_code=status_code
+            })
+        return render(
+            PaginatedResponseModel,
+            item_type(data) if data else None,
+            status_code,
+            status="success",
+            message=message,
+            data=data,
+            pagination=pagination,
         )
-        return JSONResponse(status_code=status_code, content=response.model_dump())
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from app.core.database import run_in_session
+from app.db.repositories.token import get_revocations_db, prune_revocations_db
+
+logger = logging.getLogger(__name__)
+
+
+# Stored naive UTC timestamp -> epoch seconds, comparable with the exp and iat claims
+def epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenDenylist:
+    """
+    In-memory copy of the revoked_tokens table, so checking a token costs a set
+    lookup and a dict lookup instead of a query.
+
+    Revocations made by this worker are applied at once; a background poll picks
+    up the ones made by other workers within `poll_interval` seconds, reading only
+    rows newer than the last one seen. Every `full_sync_interval` seconds the
+    table is pruned of expired rows and reloaded, which also drops expired
+    entries here and catches any row an incremental read missed. `on_revoke(user_id)`
+    runs for each new revocation, to drop the user's cached principals.
+    """
+
+    def __init__(self, poll_interval: float, full_sync_interval: float, on_revoke: Optional[Callable[[int], None]] = None):
+        self.poll_interval = poll_interval
+        self.full_sync_interval = full_sync_interval
+        self.on_revoke = on_revoke
+        # jti -> expiry of the token
+        self._jtis: Dict[str, float] = {}
+        # user id -> (tokens issued up to this time are revoked, expiry of the entry)
+        self._cutoffs: Dict[int, Tuple[float, float]] = {}
+        self._last_id = 0
+        self._last_full_sync = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.syncs = 0
+        self.full_syncs = 0
+        self.errors = 0
+
+    def is_revoked(self, claims: dict) -> bool:
+        """Whether the token with these (verified) claims was revoked."""
+        if self.is_spent(claims.get("jti")):
+            return True
+        cutoff = self._cutoffs.get(claims.get("uid"))
+        return cutoff is not None and claims.get("iat", 0) <= cutoff[0]
+
+    def is_spent(self, jti: Optional[str]) -> bool:
+        """Whether this exact token was revoked (for a refresh token: already rotated)."""
+        return jti is not None and jti in self._jtis
+
+    def apply(self, rows: Iterable):
+        """Add revoked_tokens rows, from this worker's writes or a poll."""
+        for row in rows:
+            self._last_id = max(self._last_id, row.id)
+            if row.jti is not None:
+                if row.jti in self._jtis:
+                    continue
+                self._jtis[row.jti] = epoch(row.expires_at)
+            else:
+                cutoff = (epoch(row.revoked_at), epoch(row.expires_at))
+                if self._cutoffs.get(row.user_id, (0.0, 0.0))[0] >= cutoff[0]:
+                    continue
+                self._cutoffs[row.user_id] = cutoff
+            if self.on_revoke is not None:
+                self.on_revoke(row.user_id)
+
+    async def sync(self):
+        """Read the revocations made since the last sync."""
+        self.apply(await run_in_session(get_revocations_db, self._last_id))
+        self.syncs += 1
+
+    async def full_sync(self):
+        """Prune expired rows, then replace everything with the table's contents."""
+        await run_in_session(prune_revocations_db)
+        rows = await run_in_session(get_revocations_db)
+        now = time.time()
+        self._jtis = {jti: expires for jti, expires in self._jtis.items() if expires > now}
+        self._cutoffs = {user_id: cutoff for user_id, cutoff in self._cutoffs.items() if cutoff[1] > now}
+        self.apply(rows)
+        self._last_full_sync = time.monotonic()
+        self.full_syncs += 1
+
+    def start(self):
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._cutoffs),
+            "last_id": self._last_id,
+            "poll_interval_seconds": self.poll_interval,
+            "syncs": self.syncs,
+            "full_syncs": self.full_syncs,
+            "errors": self.errors,
+        }
+
+    async def _poll(self):
+        while True:
+            try:
+                if time.monotonic() - self._last_full_sync >= self.full_sync_interval:
+                    await self.full_sync()
+                else:
+                    await self.sync()
+            except Exception:
+                self.errors += 1
+                logger.exception("Could not sync the token denylist")
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,105 @@
+"""
+Compare the sync (threadpool) and async (asyncpg) database paths under the same load.
+
+Each mode is served by its own uvicorn process (DB_ASYNC=false / true) against the
+database in DATABASE_URL. The same concurrent client then logs in once and hammers
+GET /api/v1/jobs/ and GET /api/v1/users/user/.
+
+    python benchmarks/bench_db_modes.py --email admin@example.com --password secret \\
+        --concurrency 200 --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+PATHS = ["/api/v1/jobs/", "/api/v1/users/user/"]
+
+
+def start_server(db_async: bool, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC="true" if db_async else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def run_load(base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        login = await client.post("/api/v1/users/login/", json={"email": args.email, "password": args.password})
+        token = login.json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        latencies = []
+        errors = 0
+        counter = iter(range(args.requests))
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                response = await client.get(PATHS[i % len(PATHS)], headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 500:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_s": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    for db_async in (False, True):
+        server = start_server(db_async, args.port)
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", args))
+        finally:
+            server.terminate()
+            server.wait()
+        mode = "async" if db_async else "sync"
+        print(
+            f"{mode:>5}: {result['req_per_s']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+            f"p95 {result['p95_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+            f"errors {result['errors']}/{result['requests']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-response cost of ResponseHandler.success for a 1-item and a 1,000-item job list.
+
+"before" is the previous implementation (a generic specialized on every call, then
+model_dump() and the stdlib-JSON JSONResponse); "after" is the current ResponseHandler.
+Needs no database:
+
+    DATABASE_URL=postgresql://localhost/unused python benchmarks/bench_response_envelope.py
+"""
+import argparse
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from app.api.v1.schemas.job import JobResponse  # noqa: E402
+from app.utils.response_utils import ResponseHandler, ResponseModel  # noqa: E402
+
+
+def legacy_success(data=None, message="Operation successful", status_code=200):
+    response = ResponseModel[
+        type(data) if data is not None else None
+    ](
+        status="success",
+        message=message,
+        data=data,
+        status_code=status_code
+    )
+    return JSONResponse(status_code=status_code, content=response.model_dump())
+
+
+def make_jobs(count: int):
+    now = datetime.now()
+    return [
+        JobResponse(
+            id=str(uuid.uuid4()),
+            title=f"Backend Engineer {i}",
+            category="Engineering",
+            experience_required=i % 10,
+            last_date=None,
+            status="active",
+            location="remote",
+            timing="full-time",
+            about="Build and operate the services behind our hiring platform. " * 4,
+            responsibilities=["Design APIs", "Review code", "Own on-call rotations"],
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size, number in ((1, 20000), (1000, 50)):
+        jobs = make_jobs(size)
+        assert json.loads(legacy_success(data=jobs).body) == json.loads(ResponseHandler.success(data=jobs).body)
+        results = {}
+        for name, fn in (("before", legacy_success), ("after", ResponseHandler.success)):
+            best = min(timeit.repeat(lambda: fn(data=jobs, message="Jobs fetched successfully"), number=number, repeat=args.repeat))
+            results[name] = best / number * 1e6
+        print(
+            f"{size:>5} job(s): before {results['before']:10.1f} us  after {results['after']:10.1f} us  "
+            f"speedup x{results['before'] / results['after']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
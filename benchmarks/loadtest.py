@@ -0,0 +1,272 @@
+"""
+Load test the main endpoints and record throughput, latency and queries per request.
+
+By default the real app (app.main:app) is driven in-process through httpx's ASGI
+transport: no sockets are involved and every SQL statement is attributed to the
+request that issued it. With --url a running server is driven over HTTP instead;
+queries per request are not available there.
+
+Seed a disposable database first (see seed.py), then record a baseline and
+compare later runs against it:
+
+    python benchmarks/seed.py --reset --jobs 20000
+    python benchmarks/loadtest.py --out benchmarks/results/baseline.json
+    python benchmarks/loadtest.py --compare benchmarks/results/baseline.json \\
+        --out benchmarks/results/after.json
+
+Each scenario runs on its own, so its numbers are not mixed with the others.
+All requests come from one address, so turn the auth rate limits off
+(RATE_LIMIT_BACKEND=none) unless the limiter itself is being measured.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed import EMAIL_DOMAIN, synthetic_job  # noqa: E402
+
+# Statements executed on behalf of the current request (in-process mode only)
+query_count = contextvars.ContextVar("query_count", default=None)
+
+# Lower is better for these, higher for req_per_s
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def job_payload(rng: random.Random) -> dict:
+    job = synthetic_job(rng, datetime.now(timezone.utc), days=30)
+    # Benchmark postings stay off the public board
+    job["status"] = "private"
+    job["last_date"] = job["last_date"].isoformat() if job["last_date"] else None
+    for key in ("id", "created_at", "updated_at"):
+        del job[key]
+    return job
+
+
+class Scenarios:
+    """The requests each scenario sends; `i` is the request's sequence number."""
+
+    def __init__(self, args, headers: dict, job_ids: list):
+        self.args = args
+        self.headers = headers
+        self.job_ids = job_ids
+        self.created_ids = []
+        self.rng = random.Random(args.seed)
+
+    async def login(self, client, i):
+        return await client.post("/api/v1/users/login/", json={"email": self.args.email, "password": self.args.password})
+
+    async def list_jobs(self, client, i):
+        params = [{}, {"status": "active"}, {"location": "remote"}, {"limit": 50}][i % 4]
+        return await client.get("/api/v1/jobs/", params=params, headers=self.headers)
+
+    async def get_job(self, client, i):
+        return await client.get(f"/api/v1/jobs/{self.job_ids[i % len(self.job_ids)]}/", headers=self.headers)
+
+    async def create_job(self, client, i):
+        response = await client.post("/api/v1/jobs/", json=job_payload(self.rng), headers=self.headers)
+        if response.status_code == 200:
+            self.created_ids.append(response.json()["data"]["id"])
+        return response
+
+    async def update_job(self, client, i):
+        # Edit the postings this run created, so the seeded data stays as seeded
+        ids = self.created_ids or self.job_ids
+        return await client.put(f"/api/v1/jobs/{ids[i % len(ids)]}/edit/", json=job_payload(self.rng), headers=self.headers)
+
+    async def list_members(self, client, i):
+        return await client.get("/api/v1/members/", headers=self.headers)
+
+
+SCENARIOS = ["login", "list_jobs", "get_job", "create_job", "update_job", "list_members"]
+
+
+def summarize(latencies, queries, statuses: Counter, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in statuses.items() if code >= 400),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "req_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": cuts[49] * 1000 if cuts else 0.0,
+        "p95_ms": cuts[94] * 1000 if cuts else 0.0,
+        "p99_ms": cuts[98] * 1000 if cuts else 0.0,
+        "queries_per_request": statistics.fmean(queries) if queries else None,
+    }
+
+
+async def run_scenario(client, send, requests: int, concurrency: int) -> dict:
+    latencies, queries = [], []
+    statuses = Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            counted = [0]
+            token = query_count.set(counted)
+            start = time.perf_counter()
+            try:
+                response = await send(client, i)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError:
+                statuses[599] += 1
+            finally:
+                latencies.append(time.perf_counter() - start)
+                query_count.reset(token)
+            queries.append(counted[0])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, queries, statuses, time.perf_counter() - started
+
+
+def count_queries_in_process():
+    """Attribute every statement to the request whose context issued it."""
+    from sqlalchemy import event
+    from app.core.database import async_engine, engine
+
+    def before_cursor_execute(*_):
+        counted = query_count.get()
+        if counted is not None:
+            counted[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def run_all(client, args, in_process: bool) -> dict:
+    login = await client.post("/api/v1/users/login/", json={"email": args.email, "password": args.password})
+    if login.status_code != 200:
+        raise SystemExit(f"login as {args.email} failed ({login.status_code}); seed the database first")
+    headers = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+    page = await client.get("/api/v1/jobs/", params={"limit": 100}, headers=headers)
+    job_ids = [job["id"] for job in page.json().get("data") or []]
+    if not job_ids:
+        raise SystemExit("no jobs to read; seed the database first")
+
+    scenarios = Scenarios(args, headers, job_ids)
+    results = {}
+    for name in args.scenarios:
+        requests = args.login_requests if name == "login" else args.requests
+        # A short warm-up fills pools and caches the same way for every run
+        await run_scenario(client, getattr(scenarios, name), min(args.warmup, requests), args.concurrency)
+        latencies, queries, statuses, elapsed = await run_scenario(client, getattr(scenarios, name), requests, args.concurrency)
+        results[name] = summarize(latencies, queries if in_process else [], statuses, elapsed)
+        print(format_result(name, results[name]))
+    return results
+
+
+async def run_in_process(args) -> dict:
+    from app.main import app
+
+    count_queries_in_process()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await run_all(client, args, in_process=True)
+
+
+async def run_over_http(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        return await run_all(client, args, in_process=False)
+
+
+def format_result(name: str, result: dict) -> str:
+    queries = result["queries_per_request"]
+    return (
+        f"{name:>13}: {result['req_per_s']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+        f"p95 {result['p95_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+        f"queries {'-' if queries is None else f'{queries:.2f}':>5}  errors {result['errors']}/{result['requests']}"
+    )
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Print the percentage change of every metric; return the regressions beyond `threshold` percent."""
+    regressions = []
+    print(f"\nchange vs baseline ({baseline['meta'].get('git_rev') or 'unknown'}), regressions beyond {threshold:.0f}% marked !")
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        cells = []
+        for key in ("req_per_s",) + LATENCY_KEYS + ("queries_per_request",):
+            old, new = before.get(key), now.get(key)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            worse = -change if key == "req_per_s" else change
+            # Any extra query per request is a regression, not noise
+            regressed = new > old if key == "queries_per_request" else worse > threshold
+            if regressed:
+                regressions.append((name, key, old, new))
+            cells.append(f"{key} {change:+6.1f}%{'!' if regressed else ' '}")
+        print(f"{name:>13}: " + "  ".join(cells))
+    return regressions
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="drive a running server over HTTP instead of the app in-process")
+    parser.add_argument("--email", default=f"bench_admin_0@{EMAIL_DOMAIN}")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=200, help="requests for the login scenario (bcrypt bound)")
+    parser.add_argument("--warmup", type=int, default=50, help="unrecorded requests before each scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 when a regression is found")
+    args = parser.parse_args()
+
+    meta = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_rev": git_rev(),
+        "mode": "http" if args.url else "in-process",
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "env": {name: os.getenv(name) for name in ("DB_ASYNC", "DB_POOL_SIZE", "CACHE_BACKEND", "RATE_LIMIT_BACKEND")},
+    }
+    scenarios = asyncio.run(run_over_http(args) if args.url else run_in_process(args))
+    current = {"meta": meta, "scenarios": scenarios}
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as file:
+            json.dump(current, file, indent=2)
+        print(f"\nresults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), current, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Seed the database in DATABASE_URL with synthetic users and jobs for benchmarking.
+
+Users get emails at @bench.example.com and all share one password, so the load
+test can log in as any of them. Jobs get realistic categories, titles, arrays of
+responsibilities and creation/closing dates spread over the last --days days.
+
+    python benchmarks/seed.py --admins 5 --editors 20 --viewers 200 --jobs 50000 \\
+        --password bench-password
+
+--reset first deletes the benchmark users and EVERY job; use it only against a
+disposable database.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EMAIL_DOMAIN = "bench.example.com"
+
+# Category -> job titles typical for it
+CATEGORIES = {
+    "Engineering": ["Backend Engineer", "Frontend Engineer", "Full Stack Developer", "Site Reliability Engineer", "Data Engineer", "Mobile Developer", "QA Engineer"],
+    "Design": ["Product Designer", "UX Researcher", "Visual Designer", "Motion Designer"],
+    "Product": ["Product Manager", "Technical Product Manager", "Product Analyst"],
+    "Marketing": ["Content Marketer", "SEO Specialist", "Growth Marketer", "Social Media Manager"],
+    "Sales": ["Account Executive", "Sales Development Representative", "Customer Success Manager"],
+    "Operations": ["Operations Analyst", "Office Manager", "Supply Chain Coordinator"],
+    "Finance": ["Financial Analyst", "Accountant", "Payroll Specialist"],
+    "Human Resources": ["HR Generalist", "Talent Acquisition Partner", "People Operations Specialist"],
+    "Data Science": ["Data Scientist", "Machine Learning Engineer", "Analytics Engineer"],
+    "Support": ["Support Engineer", "Technical Support Specialist", "Customer Support Agent"],
+}
+SENIORITY = ["Junior", "", "", "Senior", "Lead", "Principal"]
+VERBS = ["Design", "Build", "Own", "Maintain", "Improve", "Review", "Document", "Coordinate", "Analyse", "Support"]
+OBJECTS = [
+    "internal APIs", "customer onboarding flows", "reporting dashboards", "release processes",
+    "data pipelines", "hiring pipelines", "quarterly plans", "service level objectives",
+    "design systems", "pricing experiments", "support playbooks", "vendor relationships",
+]
+ABOUT = [
+    "You will join a small team that ships every week and owns its work end to end.",
+    "We are growing quickly and need someone who enjoys bringing structure to ambiguity.",
+    "This role works closely with engineering, design and customers across time zones.",
+    "Our stack is modern and boring on purpose; we value clarity over cleverness.",
+    "You will mentor others and help set the direction for your area.",
+]
+# Weighted the way a real board looks: most postings are active or closed
+STATUSES = ["active"] * 5 + ["closed"] * 3 + ["private"] * 2
+LOCATIONS = ["remote", "hybrid", "onsite"]
+TIMINGS = ["full-time"] * 6 + ["part-time"] * 2 + ["contract"] * 2
+
+
+def synthetic_users(args, hashed_password: str):
+    for role, count in (("admin", args.admins), ("editor", args.editors), ("viewer", args.viewers)):
+        for i in range(count):
+            username = f"bench_{role}_{i}"
+            yield {"username": username, "email": f"{username}@{EMAIL_DOMAIN}", "hashed_password": hashed_password, "role": role}
+
+
+def synthetic_job(rng: random.Random, now: datetime, days: int) -> dict:
+    category = rng.choice(list(CATEGORIES))
+    title = f"{rng.choice(SENIORITY)} {rng.choice(CATEGORIES[category])}".strip()
+    created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+    updated_at = created_at + timedelta(seconds=rng.randrange(max(1, int((now - created_at).total_seconds()))))
+    status = rng.choice(STATUSES)
+    # Active postings close in the future, closed ones mostly already have
+    last_date = created_at + timedelta(days=rng.randint(14, 90)) if rng.random() < 0.8 else None
+    if status == "active" and last_date is not None and last_date < now:
+        last_date = now + timedelta(days=rng.randint(1, 60))
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+        "title": title,
+        "category": category,
+        "experience_required": rng.choice([0, 1, 2, 3, 5, 8, 10]),
+        "status": status,
+        "location": rng.choice(LOCATIONS),
+        "timing": rng.choice(TIMINGS),
+        "about": " ".join(rng.sample(ABOUT, rng.randint(2, 4))),
+        "responsibilities": [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}" for _ in range(rng.randint(3, 6))],
+        "created_at": created_at.replace(tzinfo=None),
+        "updated_at": updated_at.replace(tzinfo=None),
+        "last_date": last_date.replace(tzinfo=None) if last_date else None,
+    }
+
+
+def insert_batches(connection, table, rows, batch_size: int) -> int:
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            connection.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--editors", type=int, default=10)
+    parser.add_argument("--viewers", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365, help="spread job creation dates over this many days")
+    parser.add_argument("--password", default="bench-password", help="password of every benchmark user")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, so runs are reproducible")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--reset", action="store_true", help="delete benchmark users and ALL jobs first")
+    args = parser.parse_args()
+
+    # The generators above are shared with loadtest.py, which may run without a database
+    from app.core.config import settings
+    from app.core.database import engine
+    from app.core.security import _hash
+    from app.db.models.job import Job
+    from app.db.models.user import User
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    # One hash for everyone: seeding should not spend minutes in bcrypt
+    hashed_password = _hash(args.password, settings.BCRYPT_ROUNDS)
+
+    with engine.begin() as connection:
+        if args.reset:
+            connection.execute(delete(Job.__table__))
+            connection.execute(delete(User.__table__).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        users = insert_batches(connection, User.__table__, synthetic_users(args, hashed_password), args.batch_size)
+        jobs = insert_batches(connection, Job.__table__, (synthetic_job(rng, now, args.days) for _ in range(args.jobs)), args.batch_size)
+
+    print(f"seeded {users} users and {jobs} jobs in {time.perf_counter() - started:.1f}s")
+    print(f"log in as bench_admin_0@{EMAIL_DOMAIN} / {args.password}")
+
+
+if __name__ == "__main__":
+    main()
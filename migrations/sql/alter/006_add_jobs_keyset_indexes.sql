@@ -0,0 +1,10 @@
+-- Keyset pagination for GET /api/v1/jobs: newest first, id breaks ties.
+-- Each index matches ORDER BY created_at DESC, id DESC so any page is an index seek.
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at_id ON jobs (created_at DESC, id DESC);
+
+-- Equality filters with their own ordered index
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at_id ON jobs (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_category_created_at_id ON jobs (category, created_at DESC, id DESC);
+
+-- location, timing and experience filters are low-cardinality; they are checked while
+-- walking one of the indexes above, which stops as soon as the page is full.
@@ -0,0 +1,4 @@
+-- Facet counts for the dashboard sidebar:
+-- SELECT category, status, location, timing, count(*) FROM jobs GROUP BY 1, 2, 3, 4
+-- is answered by an index-only scan, and the leading category column serves DISTINCT category.
+CREATE INDEX IF NOT EXISTS idx_jobs_facets ON jobs (category, status, location, timing);
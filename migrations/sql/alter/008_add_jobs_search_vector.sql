@@ -0,0 +1,15 @@
+-- Full-text search over title, about and responsibilities for GET /api/v1/jobs/search/
+
+-- array_to_string is only STABLE and generated columns need IMMUTABLE expressions
+CREATE OR REPLACE FUNCTION jobs_responsibilities_text(text[]) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$ SELECT array_to_string($1, ' ') $$;
+
+-- Title ranks above about, about above responsibilities
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(about, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(jobs_responsibilities_text(responsibilities), '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_search_vector ON jobs USING GIN (search_vector);
@@ -0,0 +1,27 @@
+-- jobs.updated_at backs the ETag/Last-Modified validators of GET /api/v1/jobs.
+-- Until now it was stamped with the time the app was imported and never moved.
+
+-- Rows that were never stamped correctly are at least as new as their creation
+UPDATE jobs SET updated_at = created_at WHERE updated_at IS NULL OR updated_at < created_at;
+
+ALTER TABLE jobs ALTER COLUMN updated_at SET DEFAULT (now() AT TIME ZONE 'utc');
+ALTER TABLE jobs ALTER COLUMN updated_at SET NOT NULL;
+
+-- Every UPDATE moves updated_at, including ones issued outside the ORM.
+-- clock_timestamp() so two writes in one transaction still get distinct values.
+CREATE OR REPLACE FUNCTION jobs_touch_updated_at() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp() AT TIME ZONE 'utc';
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS trg_jobs_touch_updated_at ON jobs;
+CREATE TRIGGER trg_jobs_touch_updated_at
+    BEFORE UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION jobs_touch_updated_at();
+
+-- max(updated_at) for the unfiltered list is a single index probe
+CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at);
@@ -0,0 +1,14 @@
+-- Member directory: GET /api/v1/members pages through users by id (keyset),
+-- optionally filtered by role and searched by username/email.
+
+-- Role filter walks this index in id order and stops as soon as the page is full
+CREATE INDEX IF NOT EXISTS idx_users_role_id ON users (role, id);
+
+-- Case-insensitive prefix search (lower(x) LIKE 'abc%') is a btree range scan
+CREATE INDEX IF NOT EXISTS idx_users_username_lower_prefix ON users (lower(username) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_lower_prefix ON users (lower(email) text_pattern_ops);
+
+-- Substring search (lower(x) LIKE '%abc%') uses trigram indexes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_users_username_lower_trgm ON users USING GIN (lower(username) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_lower_trgm ON users USING GIN (lower(email) gin_trgm_ops);
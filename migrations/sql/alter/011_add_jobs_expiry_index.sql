@@ -0,0 +1,5 @@
+-- The expiry scheduler closes active jobs whose last_date has passed:
+--   UPDATE jobs ... WHERE status = 'active' AND last_date < now() ... LIMIT n
+-- Only active jobs with a closing date are indexed, so the index stays small
+-- and each run reads just the rows it is about to close.
+CREATE INDEX IF NOT EXISTS idx_jobs_active_last_date ON jobs (last_date) WHERE status = 'active' AND last_date IS NOT NULL;
@@ -0,0 +1,16 @@
+-- Audit trail of job and member mutations, written in batches by the app's audit queue.
+-- No foreign keys: entries must outlive the users and jobs they describe.
+CREATE TABLE IF NOT EXISTS audit_log (
+    id BIGSERIAL PRIMARY KEY,
+    occurred_at TIMESTAMP NOT NULL,
+    actor_id INTEGER,
+    actor_email TEXT,
+    action TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    changes JSONB
+);
+
+-- GET /api/v1/audit pages newest first by id; these serve its filters
+CREATE INDEX IF NOT EXISTS idx_audit_log_entity_id ON audit_log (entity_type, entity_id, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_log_actor_id ON audit_log (actor_id, id DESC);
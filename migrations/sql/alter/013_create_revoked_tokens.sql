@@ -0,0 +1,14 @@
+-- Denylist behind logout, refresh-token rotation and "revoke all sessions".
+-- A row with a jti denies that one token; a row without one denies every token
+-- of the user issued up to revoked_at. Rows are useless once expires_at has
+-- passed (the tokens they cover have expired) and are pruned by the app.
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    id BIGSERIAL PRIMARY KEY,
+    jti TEXT UNIQUE,
+    user_id INTEGER NOT NULL,
+    revoked_at TIMESTAMP NOT NULL,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Pruning
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens (expires_at);
@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.utils import audit
+from app.utils.audit import AuditLog
+
+ACTOR = SimpleNamespace(id=1, email="admin@example.com")
+
+
+def fake_store(monkeypatch, gate=None):
+    """Replace the table insert; with `gate`, every insert waits until it is set."""
+    batches = []
+
+    async def run_in_session(fn, batch):
+        if gate is not None:
+            await gate.wait()
+        batches.append(list(batch))
+
+    monkeypatch.setattr(audit, "run_in_session", run_in_session)
+    return batches
+
+
+async def test_events_are_written_in_batches(monkeypatch):
+    batches = fake_store(monkeypatch)
+    log = AuditLog(max_pending=100, batch_size=3, flush_interval=60, enqueue_timeout=1)
+    log.start()
+    for i in range(7):
+        await log.record(ACTOR, "job.create", "job", i)
+    await log.stop()
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [event["entity_id"] for batch in batches for event in batch] == [str(i) for i in range(7)]
+    assert batches[0][0]["actor_email"] == "admin@example.com"
+    assert (log.recorded, log.written, log.lost) == (7, 7, 0)
+
+
+async def test_full_queue_makes_record_wait_for_room(monkeypatch):
+    gate = asyncio.Event()
+    batches = fake_store(monkeypatch, gate)
+    log = AuditLog(max_pending=2, batch_size=2, flush_interval=60, enqueue_timeout=5)
+    log.start()
+    # The writer takes the first two and blocks on the insert; the next two fill the queue
+    for i in range(4):
+        await log.record(ACTOR, "job.create", "job", i)
+        await asyncio.sleep(0.01)
+    blocked = asyncio.create_task(log.record(ACTOR, "job.create", "job", 4))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    gate.set()
+    await blocked
+    await log.stop()
+    assert log.waits == 1
+    assert sum(len(batch) for batch in batches) == 5
+    assert log.lost == 0
+
+
+async def test_event_is_logged_when_the_queue_stays_full(monkeypatch, caplog):
+    fake_store(monkeypatch, asyncio.Event())
+    log = AuditLog(max_pending=1, batch_size=1, flush_interval=60, enqueue_timeout=0.01, shutdown_timeout=0.1)
+    log.start()
+    for i in range(3):
+        await log.record(ACTOR, "job.create", "job", i)
+        await asyncio.sleep(0.01)
+    await log.stop()
+    # One blocked in the insert, one queued, one timed out; stop() gives up on the first two
+    assert log.waits == 1
+    assert log.lost == 3
+    assert "Audit event not stored" in caplog.text
+
+
+async def test_record_without_the_writer_logs_the_event(monkeypatch, caplog):
+    batches = fake_store(monkeypatch)
+    log = AuditLog(max_pending=10, batch_size=10, flush_interval=60, enqueue_timeout=1)
+    await log.record(None, "job.expire", "job", 1)
+    assert batches == []
+    assert log.lost == 1
+    assert "job.expire" in caplog.text
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from app.utils.conditional import as_utc, etag_matches, not_modified, page_etag, row_etag
+
+UPDATED_AT = datetime(2026, 5, 1, 12, 30, 15, 123456)
+
+
+def request_with(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def page(*updates):
+    return [SimpleNamespace(id=i, updated_at=updated_at) for i, updated_at in enumerate(updates)]
+
+
+def test_naive_timestamps_are_read_as_utc():
+    assert as_utc(UPDATED_AT) == UPDATED_AT.replace(tzinfo=timezone.utc)
+    ist = timezone(timedelta(hours=5, minutes=30))
+    assert as_utc(UPDATED_AT.replace(tzinfo=ist)) == UPDATED_AT.replace(tzinfo=ist).astimezone(timezone.utc)
+
+
+def test_row_etag_changes_with_every_write():
+    assert row_etag(1, UPDATED_AT) == row_etag(1, UPDATED_AT)
+    assert row_etag(1, UPDATED_AT) != row_etag(1, UPDATED_AT + timedelta(microseconds=1))
+    assert row_etag(1, UPDATED_AT) != row_etag(2, UPDATED_AT)
+
+
+def test_page_etag_tracks_the_rows_on_the_page():
+    etag = page_etag(page(UPDATED_AT, UPDATED_AT), has_more=True)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert page_etag(page(UPDATED_AT, UPDATED_AT), has_more=True) == etag
+    # A row written, a row gone, or rows appearing after the page
+    assert page_etag(page(UPDATED_AT, UPDATED_AT + timedelta(seconds=1)), has_more=True) != etag
+    assert page_etag(page(UPDATED_AT), has_more=True) != etag
+    assert page_etag(page(UPDATED_AT, UPDATED_AT), has_more=False) != etag
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ("*", True),
+    ('"abcd"', False),
+    ("", False),
+])
+def test_etag_matches_uses_weak_comparison(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    since = format_datetime(as_utc(UPDATED_AT) + timedelta(days=1), usegmt=True)
+    request = request_with(if_none_match='"other"', if_modified_since=since)
+    assert not not_modified(request, '"abc"', UPDATED_AT)
+
+
+def test_if_modified_since_has_whole_second_precision():
+    same_second = format_datetime(as_utc(UPDATED_AT).replace(microsecond=0), usegmt=True)
+    earlier = format_datetime(as_utc(UPDATED_AT) - timedelta(seconds=1), usegmt=True)
+    assert not_modified(request_with(if_modified_since=same_second), '"abc"', UPDATED_AT)
+    assert not not_modified(request_with(if_modified_since=earlier), '"abc"', UPDATED_AT)
+
+
+def test_unparseable_or_missing_validators_are_modified():
+    assert not not_modified(request_with(if_modified_since="yesterday"), '"abc"', UPDATED_AT)
+    assert not not_modified(request_with(), '"abc"', UPDATED_AT)
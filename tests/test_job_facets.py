@@ -0,0 +1,62 @@
+from app.utils.job import JobFacetCache
+
+ROWS = [
+    ("design", "active", "remote", "full-time", 2),
+    ("design", "closed", "onsite", "contract", 1),
+    ("engineering", "active", "remote", "full-time", 3),
+]
+
+
+def loaded_cache():
+    cache = JobFacetCache(ttl=60)
+    cache.load(ROWS, cache.generation)
+    return cache
+
+
+def test_load_rolls_up_counts_per_field():
+    facets = loaded_cache().get()
+    assert facets["category"] == {"design": 3, "engineering": 3}
+    assert facets["status"] == {"active": 5, "closed": 1}
+    assert facets["location"] == {"remote": 5, "onsite": 1}
+    assert facets["timing"] == {"full-time": 5, "contract": 1}
+    assert facets["total"] == 6
+
+
+def test_get_is_a_miss_until_loaded():
+    cache = JobFacetCache(ttl=60)
+    assert cache.get() is None
+    assert cache.misses == 1
+
+
+def test_writes_adjust_counts_in_place():
+    cache = loaded_cache()
+    cache.add(("sales", "private", "hybrid", "part-time"))
+    cache.move(("design", "active", "remote", "full-time"), ("design", "closed", "remote", "full-time"))
+    cache.remove(("design", "closed", "onsite", "contract"))
+    facets = cache.get()
+    assert facets["category"] == {"design": 2, "engineering": 3, "sales": 1}
+    assert facets["status"] == {"active": 4, "closed": 1, "private": 1}
+    assert "contract" not in facets["timing"]
+    assert facets["total"] == 6
+
+
+def test_load_racing_a_write_is_not_installed():
+    cache = JobFacetCache(ttl=60)
+    generation = cache.generation
+    cache.add(("design", "active", "remote", "full-time"))
+    facets = cache.load(ROWS, generation)
+    # Still answers the request that loaded it, but the next read reloads
+    assert facets["total"] == 6
+    assert cache.get() is None
+
+
+def test_expired_counts_are_reloaded():
+    cache = JobFacetCache(ttl=0)
+    cache.load(ROWS, cache.generation)
+    assert cache.get() is None
+
+
+def test_invalidate_drops_the_counts():
+    cache = loaded_cache()
+    cache.invalidate()
+    assert cache.get() is None
@@ -0,0 +1,97 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes import job as job_routes
+from app.api.v1.schemas.job import JOB_FIELDS, JOB_SUMMARY_FIELDS, JobFieldSelection, JobResponse, JobSummaryResponse, job_projection
+from app.core.cache import MemoryBackend
+from app.core.database import get_db
+from app.db.repositories.job import job_field_columns
+from app.main import app
+from app.utils.auth import get_current_user
+from app.utils.job import job_cache
+
+ROW = dict(
+    id=uuid.UUID("2f1c6a4e-0000-4000-8000-000000000001"), title="Designer", category="Design", experience_required=2,
+    last_date=datetime(2030, 1, 1), status="active", location="remote", timing="full-time", about="About the role",
+    responsibilities=["Draw"], created_at=datetime(2026, 1, 2, 3, 4, 5), updated_at=datetime(2026, 1, 3),
+)
+
+
+def test_no_selection_is_the_full_job():
+    assert JobFieldSelection().resolve() is None
+    assert job_projection(None) is JobResponse
+
+
+def test_summary_view():
+    fields = JobFieldSelection(view="summary").resolve()
+    assert fields == JOB_SUMMARY_FIELDS
+    assert job_projection(fields) is JobSummaryResponse
+    assert not {"about", "responsibilities"} & set(fields)
+
+
+def test_fields_are_returned_in_schema_order_and_win_over_view():
+    assert JobFieldSelection(view="summary", fields=" status,title ,").resolve() == ("title", "status")
+    assert JobFieldSelection(fields=",".join(reversed(JOB_FIELDS))).resolve() is None
+
+
+def test_unknown_fields_are_named():
+    with pytest.raises(ValueError, match="Unknown job fields: password, salary"):
+        JobFieldSelection(fields="title,salary,password").resolve()
+    with pytest.raises(ValueError, match="No job fields selected"):
+        JobFieldSelection(fields=",").resolve()
+
+
+def test_projection_renders_only_the_selected_fields():
+    schema = job_projection(("id", "title", "last_date"))
+    assert schema.model_validate(SimpleNamespace(**ROW)).model_dump() == {
+        "id": str(ROW["id"]), "title": "Designer", "last_date": "2030-01-01 00:00:00",
+    }
+
+
+def test_cursor_columns_are_read_even_when_not_selected():
+    assert [column.name for column in job_field_columns(("title", "id"), "created_at", "id", "updated_at")] == ["title", "id", "created_at", "updated_at"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Admin client whose job list reads return one row with the selected columns plus the cursor columns."""
+    async def run_db(db, fn, filters, limit, cursor, fields):
+        names = JOB_FIELDS if fields is None else tuple(dict.fromkeys((*fields, "created_at", "id", "updated_at")))
+        row = namedtuple("Row", names)(**{name: ROW[name] for name in names})
+        return [row], None
+
+    monkeypatch.setattr(job_routes, "run_db", run_db)
+    monkeypatch.setattr(job_cache, "backend", MemoryBackend())
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(info={})
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, role="admin", email="admin@example.com", username="admin")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_list_with_fields_leaves_the_cursor_columns_out(client):
+    response = client.get("/api/v1/jobs/", params={"fields": "title,status"})
+    assert response.status_code == 200
+    assert response.json()["data"] == [{"title": "Designer", "status": "active"}]
+
+
+def test_list_summary_view(client):
+    response = client.get("/api/v1/jobs/", params={"view": "summary"})
+    assert response.status_code == 200
+    assert set(response.json()["data"][0]) == set(JOB_SUMMARY_FIELDS)
+
+
+def test_field_selections_get_different_etags(client):
+    full = client.get("/api/v1/jobs/").headers["etag"]
+    narrowed = client.get("/api/v1/jobs/", params={"fields": "title"}).headers["etag"]
+    assert full != narrowed
+
+
+def test_unknown_field_is_a_400(client):
+    response = client.get("/api/v1/jobs/", params={"fields": "title,salary"})
+    assert response.status_code == 400
+    assert response.json()["message"] == "Unknown job fields: salary"
@@ -0,0 +1,32 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.main import app
+from app.utils.auth import get_current_user
+
+ADMIN = SimpleNamespace(id=1, role="admin", email="admin@example.com", username="admin")
+
+
+@pytest.fixture
+def client():
+    """A client whose requests are made as an admin, with a session that must never be used."""
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(info={})
+    app.dependency_overrides[get_current_user] = lambda: ADMIN
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_bulk_status_change_rejects_an_unknown_status(client):
+    response = client.put("/api/v1/jobs/bulk/status/", json={"ids": [str(uuid.uuid4())], "status": "archived"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "status"]
+
+
+def test_status_change_rejects_an_unknown_status(client):
+    response = client.put(f"/api/v1/jobs/{uuid.uuid4()}/status/archived/")
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["path", "status"]
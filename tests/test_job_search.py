@@ -0,0 +1,89 @@
+import struct
+import uuid
+from collections import namedtuple
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.repositories.job import search_jobs_db
+
+Hit = namedtuple("Hit", "job rank snippet hit_id")
+
+
+def as_real(value: float) -> float:
+    """What Postgres returns for CAST(real AS double precision): the float32 value, widened."""
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def real_as_text(value: float) -> float:
+    """What psycopg2 reads for an uncast real: Postgres prints its shortest float32 form, parsed as a double."""
+    for digits in range(1, 10):
+        text = f"{value:.{digits}g}"
+        if as_real(float(text)) == value:
+            return float(text)
+    return value
+
+
+class FakeSearchSession:
+    """Answers search_jobs_db's query from a list of (id, rank), as Postgres would evaluate the hits subquery."""
+
+    def __init__(self, ranked):
+        self.ranked = ranked
+        self.statements = []
+
+    def query(self, *entities):
+        return FakeQuery(self)
+
+
+class FakeQuery:
+    def __init__(self, session):
+        self.session = session
+
+    def join(self, hits, onclause):
+        self.hits = hits
+        return self
+
+    def order_by(self, *clauses):
+        return self
+
+    def all(self):
+        compiled = self.hits.element.compile(dialect=postgresql.dialect())
+        self.session.statements.append(str(compiled))
+        params = compiled.params
+        after_rank = next((value for value in params.values() if isinstance(value, float)), None)
+        after_id = next((value for value in params.values() if isinstance(value, uuid.UUID)), None)
+        limit = max(value for value in params.values() if isinstance(value, int))
+        # Postgres compares a real against a double parameter by widening the real
+        read = (lambda rank: rank) if "CAST(ts_rank_cd" in str(compiled) else real_as_text
+        rows = sorted(self.session.ranked, key=lambda hit: (-hit[1], hit[0]))
+        if after_rank is not None:
+            rows = [(job_id, rank) for job_id, rank in rows if rank < after_rank or (rank == after_rank and job_id > after_id)]
+        return [Hit(SimpleNamespace(id=job_id), read(rank), None, job_id) for job_id, rank in rows[:limit]]
+
+
+def page_through(session, limit):
+    seen, cursor = [], None
+    for _ in range(len(session.ranked) + 1):
+        page, cursor = search_jobs_db(session, "designer", limit=limit, cursor=cursor)
+        seen.extend(job.id for job, rank, snippet in page)
+        if cursor is None:
+            return seen
+    raise AssertionError(f"paging did not finish after {len(seen)} hits")
+
+
+def test_paging_through_tied_ranks_returns_every_hit_once():
+    # 0.1 widens above itself and 0.0607927 below; both used to skip or repeat hits within a tie
+    ranks = [0.2] * 3 + [0.1] * 5 + [0.0607927] * 4 + [0.0] * 2
+    ranked = [(uuid.uuid4(), as_real(rank)) for rank in ranks]
+    expected = [job_id for job_id, rank in sorted(ranked, key=lambda hit: (-hit[1], hit[0]))]
+    for limit in (1, 2, 3, 5):
+        assert page_through(FakeSearchSession(ranked), limit) == expected
+
+
+def test_rank_is_ordered_and_compared_as_double():
+    ranked = [(uuid.uuid4(), as_real(0.1)) for _ in range(3)]
+    session = FakeSearchSession(ranked)
+    page_through(session, 1)
+    statement = session.statements[-1]
+    # Selected, compared (twice) and ordered on the same cast
+    assert statement.count("AS DOUBLE PRECISION)") == 4
@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.core.timing import RequestTiming, current_timing
+from app.utils import job_snapshot
+from app.utils.job_snapshot import PublicJobSnapshot
+
+
+def job(id, title="Designer"):
+    return SimpleNamespace(
+        id=id, title=title, category="Design", experience_required=2, status="active", location="Remote",
+        timing="Full-time", about="About", responsibilities=["Work"], last_date=datetime(2030, 1, 1),
+        created_at=datetime(2026, 1, 1), updated_at=datetime(2026, 1, 1),
+    )
+
+
+def fake_store(monkeypatch, jobs):
+    """Serve get_active_jobs_db from `jobs`, recording the ids of every read and the request it ran under."""
+    reads = []
+
+    async def run_in_session(fn, job_ids=None):
+        reads.append((sorted(str(job_id) for job_id in job_ids) if job_ids is not None else None, current_timing.get()))
+        return [row for row in jobs.values() if job_ids is None or str(row.id) in job_ids]
+
+    monkeypatch.setattr(job_snapshot, "run_in_session", run_in_session)
+    return reads
+
+
+async def test_writes_do_not_wait_for_the_patch(monkeypatch):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    jobs = {first: job(first)}
+    reads = fake_store(monkeypatch, jobs)
+    snapshot = PublicJobSnapshot(poll_interval=60, patch_delay=0.01)
+    await snapshot.rebuild()
+
+    jobs[second] = job(second, title="Engineer")
+    timing = RequestTiming()
+    token = current_timing.set(timing)
+    try:
+        await snapshot.apply([second])
+    finally:
+        current_timing.reset(token)
+    # Nothing was read yet, and the write's request is never charged for the patch
+    assert len(reads) == 1 and snapshot.stats()["pending_patches"] == 1
+    await asyncio.sleep(0.05)
+    assert reads[1] == ([str(second)], None)
+    assert b"Engineer" in snapshot.body and snapshot.patches == 1
+
+
+async def test_a_burst_of_writes_is_patched_once(monkeypatch):
+    ids = [uuid.uuid4() for _ in range(3)]
+    jobs = {}
+    reads = fake_store(monkeypatch, jobs)
+    snapshot = PublicJobSnapshot(poll_interval=60, patch_delay=0.02)
+    await snapshot.rebuild()
+
+    for job_id in ids:
+        jobs[job_id] = job(job_id)
+        await snapshot.apply([job_id])
+    await asyncio.sleep(0.06)
+    assert [job_ids for job_ids, _ in reads[1:]] == [sorted(map(str, ids))]
+    assert snapshot.stats()["jobs"] == 3 and snapshot.stats()["pending_patches"] == 0
+
+    # A later write starts a new patch
+    jobs.pop(ids[0])
+    await snapshot.apply([ids[0]])
+    await asyncio.sleep(0.06)
+    assert snapshot.patches == 2 and snapshot.stats()["jobs"] == 2
+    await snapshot.stop()
@@ -0,0 +1,40 @@
+import hashlib
+
+from app.db import migrations
+from app.db.migrations import Migration, changed_migrations, discover_migrations
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_discover_orders_base_sql_alters_then_python(tmp_path, monkeypatch):
+    sql, pys = tmp_path / "sql", tmp_path / "pys"
+    write(sql / "002_b.sql", "b")
+    write(sql / "001_a.sql", "a")
+    write(sql / "latest.sql", "ignored")
+    write(sql / "alter" / "001_alter.sql", "alter")
+    write(pys / "001_seed.py", "")
+    write(pys / "alter" / "001_fix.py", "")
+    monkeypatch.setattr(migrations, "SQL_FOLDER", sql)
+    monkeypatch.setattr(migrations, "PYTHON_FOLDER", pys)
+
+    found = discover_migrations()
+
+    assert [m.name for m in found] == ["001_a.sql", "002_b.sql", "001_alter.sql", "001_seed.py", "001_fix.py"]
+    assert found[0].checksum == hashlib.sha256(b"a").hexdigest()
+
+
+def test_changed_migrations_flags_edited_files_only(tmp_path):
+    files = [Migration(name, tmp_path / name, checksum) for name, checksum in [("a", "1"), ("b", "2"), ("c", "3"), ("d", "4")]]
+    # b was edited after it was applied, c predates checksums, d is pending
+    applied = {"a": "1", "b": "old", "c": None}
+    assert changed_migrations(files, applied) == ["b"]
+
+
+def test_repository_migrations_are_discovered():
+    names = [m.name for m in discover_migrations()]
+    assert len(names) == len(set(names))
+    assert all(len(m.checksum) == 64 for m in discover_migrations())
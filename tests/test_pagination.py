@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, split_page
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2026-01-01T00:00:00", 42)
+    assert decode_cursor(cursor, 2) == ["2026-01-01T00:00:00", "42"]
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("a/b+c?", "=" * 5)
+    assert all(char.isalnum() or char in "-_" for char in cursor)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor("only-one"), "eyJhIjoxfQ"])
+def test_decode_rejects_cursors_we_did_not_issue(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
+
+
+def test_invalid_cursor_is_a_value_error():
+    assert issubclass(InvalidCursor, ValueError)
+
+
+def test_split_page_with_more_rows():
+    rows = [SimpleNamespace(id=i) for i in range(4)]
+    page, cursor = split_page(rows, 3, lambda row: (row.id,))
+    assert [row.id for row in page] == [0, 1, 2]
+    assert decode_cursor(cursor, 1) == ["2"]
+
+
+@pytest.mark.parametrize("count", [0, 2, 3])
+def test_split_page_last_page_has_no_cursor(count):
+    rows = [SimpleNamespace(id=i) for i in range(count)]
+    page, cursor = split_page(rows, 3, lambda row: (row.id,))
+    assert len(page) == count
+    assert cursor is None
@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.pool_metrics import PoolMetrics
+
+
+def sqlite_engine(metrics, tmp_path, **options):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=metrics.pool_class(QueuePool), **options)
+    metrics.instrument(engine)
+    return engine
+
+
+def test_counts_from_many_threads_add_up(tmp_path):
+    metrics = PoolMetrics("test")
+    engine = sqlite_engine(metrics, tmp_path, pool_size=4, max_overflow=0, pool_timeout=5)
+
+    def work():
+        for _ in range(200):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = metrics.stats()
+    assert stats["checkouts"] == stats["checkins"] == 1600
+    assert stats["checkout_wait_seconds"]["count"] == 1600
+    assert stats["connects"] <= 4 and stats["checked_out"] == 0
+    engine.dispose()
+
+
+def test_checkout_timeout_is_counted(tmp_path):
+    metrics = PoolMetrics("test")
+    engine = sqlite_engine(metrics, tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.01)
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    stats = metrics.stats()
+    assert (stats["timeouts"], stats["checkouts"], stats["checkins"]) == (1, 1, 1)
+    engine.dispose()
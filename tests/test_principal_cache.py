@@ -0,0 +1,108 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes import member
+from app.core.database import get_db
+from app.main import app
+from app.utils import auth, principal_cache as principal_cache_module
+from app.utils.auth import create_access_token, create_refresh_token, get_current_user, principal_cache, resolve_principal
+from app.utils.principal_cache import Principal, PrincipalCache
+
+ALICE = Principal(id=7, email="alice@example.com", username="alice", role="editor")
+BOB = Principal(id=8, email="bob@example.com", username="bob", role="viewer")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Wall clock of the principal cache, moved by hand."""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(principal_cache_module.time, "time", lambda: now.value)
+    return now
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = PrincipalCache(ttl=60)
+    cache.put("token", ALICE)
+    clock.value += 59
+    assert cache.get("token") == ALICE
+    clock.value += 2
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_never_outlive_the_token(clock):
+    cache = PrincipalCache(ttl=60)
+    cache.put("token", ALICE, exp=clock.value + 10)
+    clock.value += 11
+    assert cache.get("token") is None
+
+
+def test_invalidate_user_drops_only_that_users_tokens():
+    cache = PrincipalCache()
+    cache.put("alice-laptop", ALICE)
+    cache.put("alice-phone", ALICE)
+    cache.put("bob", BOB)
+    cache.invalidate_user(ALICE.id)
+    assert cache.get("alice-laptop") is None and cache.get("alice-phone") is None
+    assert cache.get("bob") == BOB
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Replace the user lookup behind resolve_principal; records every lookup."""
+    calls = []
+
+    async def run_db(db, fn, email):
+        calls.append(email)
+        return SimpleNamespace(id=ALICE.id, email=email, username=ALICE.username, role=ALICE.role)
+
+    monkeypatch.setattr(auth, "run_db", run_db)
+    principal_cache.clear()
+    yield calls
+    principal_cache.clear()
+
+
+async def test_access_token_is_looked_up_once(lookups):
+    token = create_access_token({"sub": ALICE.email, "uid": ALICE.id})
+    assert await resolve_principal(None, token) == ALICE
+    assert await resolve_principal(None, token) == ALICE
+    assert lookups == [ALICE.email]
+
+
+async def test_refresh_token_is_refused_and_never_cached(lookups):
+    token = create_refresh_token({"sub": ALICE.email, "uid": ALICE.id})
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            await resolve_principal(None, token)
+        assert error.value.status_code == 401
+    assert lookups == []
+    assert principal_cache.get(token) is None
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    """Client acting as an admin, with member repository calls answered as if user 7 exists."""
+    async def run_db(db, fn, user_id, *args):
+        return SimpleNamespace(id=user_id, email=ALICE.email, username=ALICE.username, role=args[0] if args else ALICE.role)
+
+    monkeypatch.setattr(member, "run_db", run_db)
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(info={})
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=1, email="admin@example.com", username="admin", role="admin")
+    principal_cache.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    principal_cache.clear()
+
+
+@pytest.mark.parametrize("method, path", [("put", "/api/v1/members/7/change-role/viewer"), ("delete", "/api/v1/members/7/delete/")])
+def test_role_change_and_delete_drop_the_users_cached_tokens(admin_client, method, path):
+    principal_cache.put("alice-token", ALICE, exp=time.time() + 60)
+    principal_cache.put("bob-token", BOB, exp=time.time() + 60)
+    response = getattr(admin_client, method)(path)
+    assert response.status_code == 200, response.text
+    assert principal_cache.get("alice-token") is None
+    assert principal_cache.get("bob-token") == BOB
@@ -0,0 +1,74 @@
+import logging
+from collections import Counter
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.query_budget import QueryBudgetExceeded, check_query_budget, query_budget
+from app.core.timing import TimingMiddleware, current_timing
+
+SELECT_JOB = "SELECT jobs.id FROM jobs WHERE jobs.id = %(id)s"
+
+
+def budget_app():
+    """A FastAPI app behind the timing middleware whose route pretends to run `?queries=` statements."""
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware)
+
+    @app.get("/jobs/")
+    @query_budget(2)
+    async def list_jobs(queries: int = 1, repeat: bool = False):
+        timing = current_timing.get()
+        for i in range(queries):
+            timing.db_count += 1
+            timing.statements[SELECT_JOB if repeat else f"SELECT {i}"] += 1
+        return {"ok": True}
+
+    return app
+
+
+def route_of(app, path):
+    return next(route for route in app.routes if getattr(route, "path", None) == path)
+
+
+def test_suite_runs_in_raise_mode():
+    assert settings.QUERY_BUDGET_MODE == "raise"
+
+
+def test_within_budget_passes():
+    route = route_of(budget_app(), "/jobs/")
+    check_query_budget(route, 2, Counter({"SELECT 1": 1, "SELECT 2": 1}))
+
+
+def test_over_budget_raises():
+    route = route_of(budget_app(), "/jobs/")
+    with pytest.raises(QueryBudgetExceeded, match=r"GET /jobs/ ran 3 queries, budget is 2"):
+        check_query_budget(route, 3, Counter({"SELECT 1": 1, "SELECT 2": 1, "SELECT 3": 1}))
+
+
+def test_repeated_statement_raises_within_budget():
+    route = route_of(budget_app(), "/jobs/")
+    with pytest.raises(QueryBudgetExceeded, match=r"ran the same statement 2 times \(possible N\+1\): SELECT jobs.id"):
+        check_query_budget(route, 2, Counter({SELECT_JOB: 2}))
+
+
+def test_warn_mode_logs_instead(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "warn")
+    route = route_of(budget_app(), "/jobs/")
+    with caplog.at_level(logging.WARNING, logger="app.core.query_budget"):
+        check_query_budget(route, 3, Counter({SELECT_JOB: 3}))
+    assert "budget is 2" in caplog.text and "possible N+1" in caplog.text
+
+
+def test_middleware_checks_after_the_response_is_sent():
+    app = budget_app()
+    assert TestClient(app).get("/jobs/", params={"queries": 2}).status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="budget is 2"):
+        TestClient(app).get("/jobs/", params={"queries": 3})
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1"):
+        TestClient(app).get("/jobs/", params={"queries": 2, "repeat": True})
+    # The client was answered before the check ran; the failure is only the server's
+    response = TestClient(app, raise_server_exceptions=False).get("/jobs/", params={"queries": 3})
+    assert response.status_code == 200 and response.json() == {"ok": True}
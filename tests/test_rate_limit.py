@@ -0,0 +1,129 @@
+import pytest
+from fastapi import HTTPException, Request
+
+from app.core import rate_limit
+from app.core.cache import CacheUnavailable
+from app.core.rate_limit import MemoryBucketStore, RateLimiter, Rule, client_ip, parse_proxies, parse_rule
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_parse_rule():
+    assert parse_rule("login", "10/minute") == Rule("login", 10 / 60, 10)
+    assert parse_rule("login", " 5/Second ") == Rule("login", 5.0, 5)
+    assert parse_rule("login", "3") == Rule("login", 3.0, 3)
+
+
+@pytest.mark.parametrize("spec", ["", "0", "off", None])
+def test_parse_rule_turned_off(spec):
+    assert parse_rule("login", spec) is None
+
+
+@pytest.mark.parametrize("spec", ["ten/minute", "10/fortnight"])
+def test_parse_rule_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_rule("login", spec)
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    store = MemoryBucketStore(max_keys=100)
+    assert [store.take("k", 1.0, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.take("k", 1.0, 3) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert store.take("k", 1.0, 3) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert store.take("k", 1.0, 3) == 0.0
+
+
+def test_buckets_are_per_key(clock):
+    store = MemoryBucketStore(max_keys=100)
+    store.take("a", 1.0, 1)
+    assert store.take("a", 1.0, 1) > 0
+    assert store.take("b", 1.0, 1) == 0.0
+
+
+def test_idle_buckets_are_evicted_lru(clock):
+    store = MemoryBucketStore(max_keys=MemoryBucketStore.SHARDS)
+    for i in range(200):
+        store.take(f"key-{i}", 1.0, 1)
+    stats = store.stats()
+    assert stats["keys"] <= stats["max_keys"]
+    assert stats["evictions"] == 200 - stats["keys"]
+
+
+async def test_enforce_raises_429_with_retry_after(clock):
+    limiter = RateLimiter(MemoryBucketStore(max_keys=100))
+    rule = Rule("login", 0.1, 2)
+    await limiter.enforce(rule, "1.2.3.4")
+    await limiter.enforce(rule, "1.2.3.4")
+    with pytest.raises(HTTPException) as error:
+        await limiter.enforce(rule, "1.2.3.4")
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "10"
+    assert (limiter.allowed, limiter.rejected) == (2, 1)
+
+
+async def test_enforce_without_a_rule_allows_everything():
+    limiter = RateLimiter(MemoryBucketStore(max_keys=100))
+    await limiter.enforce(None, "1.2.3.4")
+    assert limiter.allowed == 0
+
+
+async def test_unreachable_shared_store_falls_back_to_memory(clock):
+    class DownStore:
+        async def take(self, key, rate, burst):
+            raise CacheUnavailable("down")
+
+    limiter = RateLimiter(MemoryBucketStore(max_keys=100), DownStore())
+    rule = Rule("login", 1.0, 1)
+    await limiter.enforce(rule, "k")
+    with pytest.raises(HTTPException):
+        await limiter.enforce(rule, "k")
+    assert limiter.fallbacks == 2
+
+
+def request_from(host, *forwarded_for):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "client": (host, 50000) if host else None, "headers": headers})
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies():
+    proxies = parse_proxies("")
+    assert client_ip(request_from("203.0.113.9", "198.51.100.1"), proxies) == "203.0.113.9"
+    assert client_ip(request_from(None), proxies) is None
+
+
+def test_forwarded_for_is_ignored_from_an_untrusted_peer():
+    assert client_ip(request_from("203.0.113.9", "198.51.100.1"), parse_proxies("10.0.0.0/8")) == "203.0.113.9"
+
+
+def test_client_is_the_rightmost_untrusted_hop():
+    proxies = parse_proxies("10.0.0.0/8, 192.168.1.5")
+    # The client claimed 1.2.3.4; the edge proxy appended the address it really saw
+    request = request_from("10.0.0.2", "1.2.3.4, 198.51.100.7", "192.168.1.5")
+    assert client_ip(request, proxies) == "198.51.100.7"
+    # Only proxies in the chain: the leftmost address is the best there is
+    assert client_ip(request_from("10.0.0.2", "10.0.0.3"), proxies) == "10.0.0.3"
+    assert client_ip(request_from("10.0.0.2"), proxies) == "10.0.0.2"
+
+
+def test_trusting_every_proxy_takes_the_leftmost_hop():
+    assert client_ip(request_from("203.0.113.9", "198.51.100.1, 203.0.113.10"), parse_proxies("*")) == "198.51.100.1"
+
+
+def test_parse_proxies_rejects_bad_entries():
+    with pytest.raises(ValueError):
+        parse_proxies("10.0.0.1, proxy.internal")
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import CacheUnavailable, RedisBackend
+
+
+class FakeRedis:
+    """In-process RESP2 server with the commands RedisBackend speaks, over asyncio.start_server."""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.values = {}
+        self.expires = {}
+        self.commands = []
+        self.connections = 0
+        self.port = 0
+        self._writers = set()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def drop_connections(self):
+        """Close every client connection, as a restart or an idle timeout would."""
+        for writer in list(self._writers):
+            writer.close()
+
+    async def stop(self):
+        self._server.close()
+        self.drop_connections()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                args = await self._read_command(reader)
+                self.commands.append(args)
+                writer.write(self._reply(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader):
+        count = int((await reader.readuntil(b"\r\n"))[1:-2])
+        args = []
+        for _ in range(count):
+            size = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    def _get(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.values.pop(key, None)
+        return self.values.get(key)
+
+    def _reply(self, args) -> bytes:
+        command, *rest = args
+        command = command.upper()
+        if command == b"AUTH":
+            return b"+OK\r\n" if rest[0].decode() == self.password else b"-WRONGPASS invalid password\r\n"
+        if command == b"SELECT":
+            return b"+OK\r\n"
+        if command == b"SET":
+            key, value, unit, ttl = rest
+            assert unit == b"PX"
+            self.values[key] = value
+            self.expires[key] = time.monotonic() + int(ttl) / 1000
+            return b"+OK\r\n"
+        if command == b"MGET":
+            values = [self._get(key) for key in rest]
+            return b"*%d\r\n" % len(values) + b"".join(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value) for value in values)
+        if command == b"INCR":
+            value = int(self._get(rest[0]) or 0) + 1
+            self.values[rest[0]] = str(value).encode()
+            return b":%d\r\n" % value
+        return b"-ERR unknown command '%s'\r\n" % command
+
+
+@pytest.fixture
+async def server():
+    fake = FakeRedis(password="s3cret")
+    await fake.start()
+    yield fake
+    await fake.stop()
+
+
+def backend_for(server, **kwargs):
+    return RedisBackend(f"redis://:s3cret@127.0.0.1:{server.port}/2", **kwargs)
+
+
+async def test_get_set_incr_mget(server):
+    backend = backend_for(server)
+    assert await backend.get_many(["missing"]) == [None]
+    await backend.set("jobs:a", b"body", ttl=1.5)
+    assert await backend.incr("jobs:version") == 1
+    assert await backend.incr("jobs:version") == 2
+    assert await backend.get_many(["jobs:version", "jobs:a", "missing"]) == [b"2", b"body", None]
+    assert [b"SET", b"jobs:a", b"body", b"PX", b"1500"] in server.commands
+    # Authenticated and selected the database once, then reused the one connection
+    assert server.commands[:2] == [[b"AUTH", b"s3cret"], [b"SELECT", b"2"]]
+    assert server.connections == 1
+    await backend.close()
+
+
+async def test_values_expire(server):
+    backend = backend_for(server)
+    await backend.set("short", b"x", ttl=0.01)
+    await asyncio.sleep(0.03)
+    assert await backend.get_many(["short"]) == [None]
+    await backend.close()
+
+
+async def test_error_reply_raises_cache_unavailable(server):
+    backend = backend_for(server)
+    with pytest.raises(CacheUnavailable, match="unknown command"):
+        await backend.eval("return 1", [], [])
+    assert backend.stats()["errors"] == 1
+    await backend.close()
+
+
+async def test_reconnects_after_the_server_closes_connections(server):
+    backend = backend_for(server)
+    assert await backend.incr("counter") == 1
+    server.drop_connections()
+    await asyncio.sleep(0.01)
+    # The stale pooled connection is replaced without failing the command
+    assert await backend.incr("counter") == 2
+    assert server.connections == 2 and backend.stats()["errors"] == 0
+    await backend.close()
+
+
+async def test_unreachable_server_then_recovery(server):
+    backend = backend_for(server, timeout=0.2)
+    await backend.set("k", b"v", ttl=60)
+    await server.stop()
+    with pytest.raises(CacheUnavailable):
+        await backend.get_many(["k"])
+    assert backend.stats()["errors"] == 1
+
+    await server.start()
+    assert await backend.get_many(["k"]) == [b"v"]
+    await backend.close()
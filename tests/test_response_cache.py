@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core.cache import MemoryBackend, ResponseCache
+from app.core.database import mark_changed, on_change, run_db
+
+
+def counting_loader(value=b"body"):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return value
+
+    return load, calls
+
+
+async def test_second_read_is_a_hit():
+    cache = ResponseCache(MemoryBackend(), "test", ttl=60)
+    load, calls = counting_loader()
+    assert await cache.get_or_load("k", load) == b"body"
+    assert await cache.get_or_load("k", load) == b"body"
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_invalidate_drops_every_entry():
+    cache = ResponseCache(MemoryBackend(), "test", ttl=60)
+    load, calls = counting_loader()
+    await cache.get_or_load("a", load)
+    await cache.get_or_load("b", load)
+    await cache.invalidate()
+    await cache.get_or_load("a", load)
+    await cache.get_or_load("b", load)
+    assert len(calls) == 4
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = ResponseCache(MemoryBackend(), "test", ttl=60)
+    load, calls = counting_loader()
+    results = await asyncio.gather(*(cache.get_or_load("k", load) for _ in range(5)))
+    assert results == [b"body"] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+
+
+async def test_none_is_not_cached():
+    cache = ResponseCache(MemoryBackend(), "test", ttl=60)
+    load, calls = counting_loader(None)
+    await cache.get_or_load("k", load)
+    await cache.get_or_load("k", load)
+    assert len(calls) == 2
+
+
+async def test_committed_writes_notify_change_listeners():
+    seen = []
+
+    async def listener(ids):
+        seen.append(ids)
+
+    async def failing(ids):
+        raise RuntimeError("listener failed")
+
+    on_change("test-topic", failing)
+    on_change("test-topic", listener)
+
+    def write(db):
+        mark_changed(db, "test-topic", [1])
+        mark_changed(db, "test-topic", [2])
+        mark_changed(db, "other-topic")
+        return "written"
+
+    db = SimpleNamespace(info={})
+    assert await run_db(db, write) == "written"
+    # One call per topic with every marked id; a failing listener does not fail the write
+    assert seen == [[1, 2]]
+    assert "changes" not in db.info
+
+
+async def test_cache_invalidated_through_change_listener():
+    cache = ResponseCache(MemoryBackend(), "test", ttl=60)
+    on_change("test-cached", cache.invalidate)
+    load, calls = counting_loader()
+    await cache.get_or_load("k", load)
+    await run_db(SimpleNamespace(info={}), lambda db: mark_changed(db, "test-cached", ["id"]))
+    await cache.get_or_load("k", load)
+    assert len(calls) == 2
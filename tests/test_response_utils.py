@@ -0,0 +1,79 @@
+import warnings
+from typing import Optional
+
+import pytest
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.utils.response_utils import PaginatedResponseModel, ResponseHandler, ResponseModel
+
+
+class Job(BaseModel):
+    id: str
+    title: str
+    last_date: Optional[str] = None
+
+
+class Member(BaseModel):
+    id: int
+    email: str
+
+
+PAYLOADS = {
+    "empty list": [],
+    "none": None,
+    "dict": {"count": 2, "by_status": {"active": 1, "closed": 1}, "tags": ["a", None]},
+    "models": [Job(id="1", title="Designer"), Job(id="2", title="Ingénieur", last_date="2030-01-01 00:00:00")],
+    "model": Job(id="1", title="Designer"),
+    "mixed scalars": [1, "two", {"three": 3}, None, 4.5, True],
+    "mixed models": [Job(id="1", title="Designer"), Member(id=2, email="a@example.com")],
+    "scalar": "text",
+}
+
+
+# ResponseHandler as it was before render(): a pydantic dump passed to JSONResponse
+def previous_success(data, message="Operation successful", status_code=200):
+    response = ResponseModel[type(data) if data is not None else None](status="success", message=message, data=data, status_code=status_code)
+    return JSONResponse(status_code=status_code, content=response.model_dump())
+
+
+def previous_paginated(data, page_size, next_cursor=None, message="Data fetched successfully"):
+    pagination = {"page_size": page_size, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+    response = PaginatedResponseModel[type(data[0]) if data else None](status="success", message=message, data=data, pagination=pagination, status_code=200)
+    return JSONResponse(status_code=200, content=response.model_dump())
+
+
+@pytest.fixture(autouse=True)
+def no_serializer_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        yield
+
+
+@pytest.mark.parametrize("data", PAYLOADS.values(), ids=PAYLOADS.keys())
+def test_success_matches_the_previous_json_response(data):
+    response = ResponseHandler.success(data=data, message="ok")
+    previous = previous_success(data, message="ok")
+    assert response.body == previous.body
+    assert response.status_code == previous.status_code
+    assert response.headers["content-type"] == previous.headers["content-type"]
+
+
+@pytest.mark.parametrize("details", [None, {"field": "title"}, ["a", 1]])
+def test_error_matches_the_previous_json_response(details):
+    response = ResponseHandler.error(message="Nope", details=details, status_code=404)
+    previous = JSONResponse(status_code=404, content=ResponseModel[type(details) if details is not None else None](status="error", message="Nope", data=details, status_code=404).model_dump())
+    assert (response.body, response.status_code) == (previous.body, 404)
+
+
+@pytest.mark.parametrize("data", [[], PAYLOADS["models"]], ids=["empty", "models"])
+def test_paginated_matches_the_previous_json_response(data):
+    response = ResponseHandler.paginated(data=data, page_size=20, next_cursor="abc", message="ok")
+    assert response.body == previous_paginated(data, 20, "abc", message="ok").body
+
+
+def test_mixed_models_keep_every_field():
+    assert b'{"id":2,"email":"a@example.com"}' in ResponseHandler.success(data=PAYLOADS["mixed models"]).body
+    # The previous paginated response refused a mixed page with a ValidationError
+    body = ResponseHandler.paginated(data=PAYLOADS["mixed models"], page_size=20).body
+    assert b'"data":[{"id":"1","title":"Designer","last_date":null},{"id":2,"email":"a@example.com"}]' in body
@@ -0,0 +1,81 @@
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.utils import token_revocation
+from app.utils.token_revocation import TokenDenylist
+
+
+def stored(seconds_from_now: float) -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=seconds_from_now)
+
+
+def row(id, user_id=7, jti=None, revoked_in=0.0, expires_in=3600.0):
+    return SimpleNamespace(id=id, jti=jti, user_id=user_id, revoked_at=stored(revoked_in), expires_at=stored(expires_in))
+
+
+def denylist(**kwargs):
+    return TokenDenylist(poll_interval=1, full_sync_interval=60, **kwargs)
+
+
+def test_revoked_jti_is_rejected():
+    tokens = denylist()
+    tokens.apply([row(1, jti="abc")])
+    assert tokens.is_revoked({"jti": "abc", "uid": 7, "iat": time.time()})
+    assert tokens.is_spent("abc")
+    assert not tokens.is_revoked({"jti": "other", "uid": 7, "iat": time.time()})
+
+
+def test_user_cutoff_rejects_only_tokens_issued_before_it():
+    tokens = denylist()
+    tokens.apply([row(1, revoked_in=0)])
+    assert tokens.is_revoked({"jti": "a", "uid": 7, "iat": time.time() - 60})
+    assert not tokens.is_revoked({"jti": "b", "uid": 7, "iat": time.time() + 1})
+    assert not tokens.is_revoked({"jti": "c", "uid": 8, "iat": time.time() - 60})
+    # No issue time: treated as issued before the cutoff
+    assert tokens.is_revoked({"uid": 7})
+
+
+def test_on_revoke_runs_once_per_new_revocation():
+    revoked = []
+    tokens = denylist(on_revoke=revoked.append)
+    tokens.apply([row(1, jti="abc", user_id=3), row(2, user_id=4)])
+    tokens.apply([row(1, jti="abc", user_id=3)])
+    # An older cutoff than the one known changes nothing
+    tokens.apply([row(3, user_id=4, revoked_in=-60)])
+    assert revoked == [3, 4]
+    assert tokens.stats()["last_id"] == 3
+
+
+async def test_sync_reads_only_newer_rows(monkeypatch):
+    reads = []
+
+    async def run_in_session(fn, after_id=0):
+        reads.append(after_id)
+        return [row(after_id + 1, jti=f"jti-{after_id + 1}")]
+
+    monkeypatch.setattr(token_revocation, "run_in_session", run_in_session)
+    tokens = denylist()
+    await tokens.sync()
+    await tokens.sync()
+    assert reads == [0, 1]
+    assert tokens.is_spent("jti-1") and tokens.is_spent("jti-2")
+
+
+async def test_full_sync_drops_expired_entries(monkeypatch):
+    pruned = []
+
+    async def run_in_session(fn, *args):
+        if fn is token_revocation.prune_revocations_db:
+            pruned.append(True)
+            return 1
+        return [row(5, jti="fresh")]
+
+    monkeypatch.setattr(token_revocation, "run_in_session", run_in_session)
+    tokens = denylist()
+    tokens.apply([row(1, jti="expired", expires_in=-1), row(2, user_id=9, expires_in=-1)])
+    await tokens.full_sync()
+    assert pruned == [True]
+    assert not tokens.is_spent("expired")
+    assert tokens.is_spent("fresh")
+    assert tokens.stats()["revoked_users"] == 0